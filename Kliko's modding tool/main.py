@@ -6,6 +6,7 @@ License: MIT
 
 import sys
 import platform
+from multiprocessing import freeze_support
 from pathlib import Path
 
 
@@ -22,6 +23,13 @@ ROOT: Path = Path(__file__).parent.resolve()
 sys.path.insert(0, str(ROOT / "libraries"))
 
 
+# Headless mode, dispatched before any GUI related imports
+if __name__ == "__main__" and "--cli" in sys.argv[1:]:
+    freeze_support()
+    from modules import cli
+    sys.exit(cli.run([arg for arg in sys.argv[1:] if arg != "--cli"]))
+
+
 try:
     from modules.logger import Logger
     from modules.project_data import ProjectData
@@ -62,4 +70,5 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    freeze_support()
     main()
\ No newline at end of file
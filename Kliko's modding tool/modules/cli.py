@@ -0,0 +1,169 @@
+"""Headless entry point: python main.py --cli <command> ...
+Must not import modules.frontend, so that no Tk root, fonts or resources are loaded"""
+
+from argparse import ArgumentParser, Namespace, ArgumentTypeError
+from pathlib import Path
+import traceback
+import json
+import re
+
+from modules.logger import Logger
+from modules.filesystem import Directories
+from modules.deployments import LatestVersion
+from modules.mod_generator import ModGenerator, GradientColor, GeneratorJob
+from modules.mod_updater import ModUpdater, UpdateResult
+
+from PIL import Image  # type: ignore
+
+
+EXIT_SUCCESS: int = 0
+EXIT_FAILURE: int = 1
+EXIT_USAGE: int = 2  # Same as argparse
+EXIT_CANCELLED: int = 130
+
+
+def _parse_color(value: str) -> tuple[int, int, int]:
+    """Accepts '#RRGGBB', 'RRGGBB' or 'R,G,B'"""
+
+    value = value.strip()
+    if re.fullmatch(r"#?[0-9a-fA-F]{6}", value):
+        value = value.removeprefix("#")
+        return (int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16))
+
+    parts: list[str] = value.split(",")
+    if len(parts) == 3 and all(part.strip().isdigit() and 0 <= int(part) <= 255 for part in parts):
+        return (int(parts[0]), int(parts[1]), int(parts[2]))
+    raise ArgumentTypeError(f"invalid color: '{value}'")
+
+
+def _parse_stop(value: str) -> GradientColor:
+    """Accepts 'STOP:COLOR', e.g. '0.5:#ff0000'"""
+
+    stop, separator, color = value.partition(":")
+    try:
+        if not separator: raise ValueError
+        stop_value: float = float(stop)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid gradient stop: '{value}', must be STOP:COLOR")
+    return GradientColor(stop_value, _parse_color(color))
+
+
+def _get_parser() -> ArgumentParser:
+    parser: ArgumentParser = ArgumentParser(prog="main.py --cli", description="Run the mod generator or mod updater without the GUI")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate: ArgumentParser = subparsers.add_parser("generate", help="generate a mod")
+    generate.add_argument("mode", choices=("color", "gradient", "custom"), nargs="?", help="required unless --jobs is given")
+    generate.add_argument("output", type=Path, nargs="?", help="output directory, defaults to output/generator/<name>")
+    generate.add_argument("--name", help="mod name, used when no output directory is given")
+    generate.add_argument("--color", type=_parse_color, help="color mode: '#RRGGBB' or 'R,G,B'")
+    generate.add_argument("--stop", type=_parse_stop, action="append", dest="stops", help="gradient mode: 'STOP:COLOR', repeat for every stop")
+    generate.add_argument("--image", type=Path, help="custom mode: path to a PNG image")
+    generate.add_argument("--angle", type=float, default=None)
+    generate.add_argument("--file-version", type=int, default=None, help="defaults to the latest version")
+    generate.add_argument("--icon-sizes", type=int, choices=(0, 1, 2, 3), default=0, help="0 generates every size")
+    generate.add_argument("--custom-roblox-icon", type=Path, default=None)
+    generate.add_argument("--no-remote-config", action="store_false", dest="use_remote_config")
+    generate.add_argument("--base-mod", type=Path, default=None, help="existing generated mod to reuse unchanged ImageSets from")
+    generate.add_argument("--jobs", type=Path, default=None, help="JSON list of {mode, data, output_dir, angle, base_mod} jobs, generated from a single download")
+    generate.add_argument("--workers", type=int, default=1)
+
+    update: ArgumentParser = subparsers.add_parser("update", help="update one or more mods to the latest version")
+    update.add_argument("mods", type=Path, nargs="+", help="mods, or directories containing mods")
+    update.add_argument("--in-place", action="store_true", help="update the mods directly instead of a copy in output/updater")
+    update.add_argument("--workers", type=int, default=1)
+
+    return parser
+
+
+def _get_generator_data(mode: str, color: tuple[int, int, int] | None, stops: list[GradientColor] | None, image: Path | None) -> tuple[int, int, int] | list[GradientColor] | Image.Image:
+    match mode:
+        case "color":
+            if color is None: raise ArgumentTypeError("color mode requires --color")
+            return color
+        case "gradient":
+            if not stops or len(stops) < 2: raise ArgumentTypeError("gradient mode requires at least two --stop")
+            return stops
+        case _:
+            if image is None: raise ArgumentTypeError("custom mode requires --image")
+            return Image.open(image, formats=("PNG",))
+
+
+def _get_generator_jobs(path: Path) -> list[GeneratorJob]:
+    with open(path) as file:
+        items: list[dict] = json.load(file)
+
+    jobs: list[GeneratorJob] = []
+    for item in items:
+        mode: str = item["mode"]
+        data = item.get("data")
+        match mode:
+            case "color": parsed_data = _get_generator_data(mode, _parse_color(data) if isinstance(data, str) else tuple(data), None, None)
+            case "gradient": parsed_data = _get_generator_data(mode, None, [_parse_stop(stop) for stop in data], None)
+            case _: parsed_data = _get_generator_data(mode, None, None, Path(path.parent, data))
+        jobs.append(GeneratorJob(mode, parsed_data, Path(path.parent, item["output_dir"]), item.get("angle"), Path(path.parent, item["base_mod"]) if item.get("base_mod") else None))  # type: ignore
+    return jobs
+
+
+def _generate(args: Namespace) -> int:
+    custom_roblox_icon: Image.Image | None = Image.open(args.custom_roblox_icon) if args.custom_roblox_icon is not None else None
+    kwargs: dict = {"file_version": args.file_version, "use_remote_config": args.use_remote_config, "icon_sizes": args.icon_sizes, "custom_roblox_icon": custom_roblox_icon, "workers": args.workers}
+
+    if args.jobs is not None:
+        result: bool = ModGenerator.generate_mods(_get_generator_jobs(args.jobs), **kwargs)
+    else:
+        if args.mode is None: raise ArgumentTypeError("mode is required unless --jobs is given")
+        data = _get_generator_data(args.mode, args.color, args.stops, args.image)
+        output: Path = args.output or Directories.OUTPUT_DIR_GENERATOR / (args.name or f"{args.mode}-mod")
+        result = ModGenerator.generate_mod(args.mode, data, output, angle=args.angle, base_mod=args.base_mod, **kwargs)
+    return EXIT_SUCCESS if result else EXIT_CANCELLED
+
+
+def _update(args: Namespace) -> int:
+    mods: list[Path] = []
+    for path in args.mods:
+        path = path.resolve()
+        if not path.exists(): raise ArgumentTypeError(f"mod not found: '{path}'")
+        found: list[Path] = ModUpdater.find_mods(path)
+        if not found: raise ArgumentTypeError(f"not a mod or a directory containing mods: '{path}'")
+        mods.extend(found)
+
+    latest_version: LatestVersion = LatestVersion("WindowsStudio64")
+    results: list[UpdateResult] = ModUpdater.update_mods(mods, latest_version, output_dir=None if args.in_place else Directories.OUTPUT_DIR_UPDATER, workers=args.workers)
+
+    exit_code: int = EXIT_SUCCESS
+    for result in results:
+        match result.status:
+            case "updated": Logger.info(f"Mod updated: '{result.output}'", prefix="cli")
+            case "up_to_date": Logger.info(f"Mod is up-to-date: '{result.mod.name}'", prefix="cli")
+            case "incompatible": Logger.info(f"Mod is not compatible: '{result.mod.name}'", prefix="cli")
+            case _:
+                Logger.error(f"Failed to update '{result.mod.name}': {type(result.exception).__name__}: {result.exception}", prefix="cli")
+                if result.exception is not None:
+                    Logger.debug("\n".join(traceback.format_exception(result.exception)), prefix="cli")
+                exit_code = EXIT_FAILURE
+    return exit_code
+
+
+def run(argv: list[str]) -> int:
+    """Returns the process exit code"""
+
+    parser: ArgumentParser = _get_parser()
+    args: Namespace = parser.parse_args(argv)
+    Logger.initialize(console=True)
+
+    try:
+        match args.command:
+            case "generate": return _generate(args)
+            case _: return _update(args)
+
+    except ArgumentTypeError as e:
+        parser.error(str(e))  # Exits with EXIT_USAGE
+
+    except KeyboardInterrupt:
+        Logger.info("Cancelled!", prefix="cli")
+        return EXIT_CANCELLED
+
+    except Exception as e:
+        Logger.critical("\n".join(traceback.format_exception(e)), prefix="cli")
+        return EXIT_FAILURE
\ No newline at end of file
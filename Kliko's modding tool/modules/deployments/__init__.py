@@ -1,4 +1,6 @@
-from .roblox_version import RobloxVersion
+from .roblox_version import RobloxVersion, FileVersion
 from .latest_version import LatestVersion
 from .package_manifest import Package, PackageManifest
-from .deploy_history import DeployHistory
\ No newline at end of file
+from .deploy_history import DeployHistory
+from .package_cache import PackageCache
+from .exceptions import *
\ No newline at end of file
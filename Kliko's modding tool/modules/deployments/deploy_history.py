@@ -1,18 +1,184 @@
-from modules.networking import requests, Response, Api
+from typing import Literal, Optional
+from pathlib import Path
+from threading import Lock
+import json
 
-from .roblox_version import RobloxVersion
+from modules.logger import Logger
+from modules.filesystem import Files, atomic_write
+from modules.networking import requests, Response, Api, RequestException, HTTPError
+
+from .roblox_version import RobloxVersion, FileVersion
+
+
+DeploymentRecord = tuple[str, str, int, int, int, int]  # (binary_type, guid, *file_version)
 
 
 class DeployHistory:
-    """Deployments are ordered oldest to newest"""
+    """
+    Deployments are ordered oldest to newest.
+
+    DeployHistory.txt is append-only, so the parsed history is persisted in Files.DEPLOY_HISTORY_CACHE together with the byte offset of the last parsed line.
+    It is refreshed once per process with a conditional range request, which only downloads and parses the lines appended since the last refresh.
+    """
+
     deployments: tuple[RobloxVersion, ...]
+    player_deployments: tuple[RobloxVersion, ...]
+    studio_deployments: tuple[RobloxVersion, ...]
+    _guid_index: dict[str, RobloxVersion]
+    _file_version_index: dict[str, dict[int, RobloxVersion]]
+
+    _LOG_PREFIX: str = "DeployHistory"
+    CACHE: Path = Files.DEPLOY_HISTORY_CACHE
+    _CACHE_VERSION: int = 2
+
+    _lock: Lock = Lock()
+    _deployments: Optional[tuple[RobloxVersion, ...]] = None
 
 
     def __init__(self) -> None:
-        response: Response = requests.get(Api.Roblox.Deployment.HISTORY)
-        text: str = response.text
+        with DeployHistory._lock:
+            if DeployHistory._deployments is None:
+                DeployHistory._deployments = tuple(RobloxVersion(binary_type, guid, FileVersion(*file_version)) for binary_type, guid, *file_version in self._get_records())  # type: ignore
+            self.deployments = DeployHistory._deployments
+        self._build_indexes()
+
+
+    def _build_indexes(self) -> None:
+        """Later deployments overwrite earlier ones, so every index points to the newest match"""
+
+        self.player_deployments = tuple(deployment for deployment in self.deployments if deployment.binary_type == "WindowsPlayer")
+        self.studio_deployments = tuple(deployment for deployment in self.deployments if deployment.binary_type == "WindowsStudio64")
+        self._guid_index = {deployment.guid: deployment for deployment in self.deployments}
+        self._file_version_index = {
+            "WindowsPlayer": {deployment.file_version.minor: deployment for deployment in self.player_deployments},
+            "WindowsStudio64": {deployment.file_version.minor: deployment for deployment in self.studio_deployments}
+        }
+
+
+    def get_by_guid(self, guid: str) -> Optional[RobloxVersion]:
+        return self._guid_index.get(guid)
+
+
+    def get_latest(self, file_version: int, binary_type: Literal["WindowsPlayer", "WindowsStudio64"] = "WindowsStudio64") -> Optional[RobloxVersion]:
+        """Returns the newest deployment of binary_type with the given minor file version"""
+
+        return self._file_version_index[binary_type].get(file_version)
+
+
+# region cache
+    @classmethod
+    def _get_records(cls) -> list[DeploymentRecord]:
+        cache: Optional[dict] = cls._read_cache()
+        if cache is not None:
+            try:
+                updated_cache: Optional[dict] = cls._refresh(cache)
+            except HTTPError as e:  # e.g. 416 if the file was replaced by a shorter one
+                Logger.warning(f"Unable to refresh deploy history due to {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+                updated_cache = None
+            except (RequestException, RuntimeError) as e:
+                Logger.warning(f"Unable to refresh deploy history due to {type(e).__name__}: {e}. Using cached deploy history", prefix=cls._LOG_PREFIX)
+                return cache["deployments"] + cls._parse(cache["tail"])
+
+            if updated_cache is not None:
+                return updated_cache["deployments"] + cls._parse(updated_cache["tail"])
+
+        Logger.info("Downloading deploy history...", prefix=cls._LOG_PREFIX)
+        cache = cls._get_cache(requests.get(Api.Roblox.Deployment.HISTORY, cache=False))
+        cls._write_cache(cache)
+        return cache["deployments"] + cls._parse(cache["tail"])
+
 
-        deployments: list[RobloxVersion] = []
+    @classmethod
+    def _refresh(cls, cache: dict) -> Optional[dict]:
+        """Returns the updated cache, or None if the whole file must be downloaded again"""
+
+        offset: int = cache["offset"]
+        if offset <= 0:
+            return None
+
+        # Starts one byte early, the last parsed line must still end at the same offset
+        headers: dict[str, str] = {"Range": f"bytes={offset - 1}-", "Accept-Encoding": "identity"}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        elif cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+        response: Response = requests.get(Api.Roblox.Deployment.HISTORY, attempts=1, cache=False, ignore_cache=True, headers=headers)
+
+        if response.status_code == 304:
+            Logger.info("Deploy history is up-to-date", prefix=cls._LOG_PREFIX)
+            return cache
+
+        if response.status_code == 200:  # Range not supported, this is the whole file
+            cache = cls._get_cache(response)
+            cls._write_cache(cache)
+            return cache
+
+        content: bytes = response.content
+        content_range: str = response.headers.get("Content-Range", "")
+        if response.status_code != 206 or not content_range.startswith(f"bytes {offset - 1}-") or not content.startswith(b"\n"):
+            Logger.warning("Deploy history was not appended to, downloading it again...", prefix=cls._LOG_PREFIX)
+            return None
+
+        content = content[1:]
+        appended_length: int = content.rfind(b"\n") + 1
+        appended: list[DeploymentRecord] = cls._parse(content[:appended_length].decode(errors="replace"))
+        Logger.info(f"Downloaded {len(content)} new bytes, {len(appended)} new deployments", prefix=cls._LOG_PREFIX)
+
+        cache.update({
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "offset": offset + appended_length,
+            "tail": content[appended_length:].decode(errors="replace"),
+            "deployments": cache["deployments"] + appended
+        })
+        cls._write_cache(cache)
+        return cache
+
+
+    @classmethod
+    def _get_cache(cls, response: Response) -> dict:
+        """Parses a complete DeployHistory.txt response. The last line is kept as tail if it is not terminated yet"""
+
+        content: bytes = response.content
+        offset: int = content.rfind(b"\n") + 1
+        return {
+            "version": cls._CACHE_VERSION,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "offset": offset,
+            "tail": content[offset:].decode(errors="replace"),
+            "deployments": cls._parse(content[:offset].decode(errors="replace"))
+        }
+
+
+    @classmethod
+    def _read_cache(cls) -> Optional[dict]:
+        if not cls.CACHE.exists():
+            return None
+        try:
+            with open(cls.CACHE) as file:
+                cache: dict = json.load(file)
+            if cache.get("version") != cls._CACHE_VERSION:
+                return None
+            cache["deployments"] = [tuple(record) for record in cache["deployments"]]
+            return cache
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            Logger.warning(f"Unable to read deploy history cache due to {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+            return None
+
+
+    @classmethod
+    def _write_cache(cls, cache: dict) -> None:
+        try:
+            with atomic_write(cls.CACHE) as temp, open(temp, "w") as file:
+                json.dump(cache, file, separators=(",", ":"))
+        except OSError as e:
+            Logger.warning(f"Unable to write deploy history cache due to {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+
+
+    @staticmethod
+    def _parse(text: str) -> list[DeploymentRecord]:
+        records: list[DeploymentRecord] = []
         valid_binary_types: set[str] = {"WindowsPlayer", "WindowsStudio64"}
         for line in text.splitlines():
             try:
@@ -25,17 +191,7 @@ class DeployHistory:
                 if binary_type not in valid_binary_types:
                     continue
                 guid: str = split_line[2]
-                deployments.append(RobloxVersion(binary_type, guid, file_version))  # type: ignore
+                records.append((binary_type, guid, *FileVersion.parse(file_version)))  # type: ignore
             except Exception: pass
-
-        self.deployments = tuple(deployments)
-
-
-    @property
-    def player_deployments(self) -> tuple[RobloxVersion, ...]:
-        return tuple(deployment for deployment in self.deployments if deployment.binary_type == "WindowsPlayer")
-
-
-    @property
-    def studio_deployments(self) -> tuple[RobloxVersion, ...]:
-        return tuple(deployment for deployment in self.deployments if deployment.binary_type == "WindowsStudio64")
\ No newline at end of file
+        return records
+# endregion
\ No newline at end of file
@@ -0,0 +1,11 @@
+class ChecksumMismatchError(Exception):
+    """Raised when a downloaded package does not match the MD5 hash listed in its package manifest"""
+    file: str
+    expected: str
+    actual: str
+
+    def __init__(self, file: str, expected: str, actual: str):
+        self.file = file
+        self.expected = expected
+        self.actual = actual
+        super().__init__(f"Checksum mismatch for '{file}': expected {expected}, got {actual}")
\ No newline at end of file
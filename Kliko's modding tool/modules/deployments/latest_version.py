@@ -2,12 +2,11 @@ from typing import Literal
 
 from modules.networking import requests, Response, Api
 
-from .roblox_version import RobloxVersion
-
-from packaging.version import Version  # type: ignore
+from .roblox_version import RobloxVersion, FileVersion
 
 
 class LatestVersion(RobloxVersion):
+    __slots__ = ("channel",)
     channel: str
 
     def __init__(self, binary_type: Literal["WindowsPlayer", "WindowsStudio64"]) -> None:
@@ -16,7 +15,7 @@ class LatestVersion(RobloxVersion):
         self.channel = self.get_user_channel()
         guid, file_version = self.get_version_info()
         self.guid = guid
-        self.file_version = Version(file_version)
+        self.file_version = FileVersion.parse(file_version)
 
 
     def get_user_channel(self) -> str:
@@ -0,0 +1,157 @@
+from pathlib import Path
+from typing import Callable, Optional
+from threading import Lock
+import hashlib
+import json
+import time
+
+from modules.logger import Logger
+from modules import filesystem
+from modules.filesystem import Directories, Files
+from modules.networking import Api
+
+from .package_manifest import Package, PackageManifest
+from .exceptions import ChecksumMismatchError
+
+
+class PackageCache:
+    """
+    Persistent on-disk cache for deployment packages.
+
+    Packages are stored by their MD5 hash, so identical packages shared by multiple versions are only stored once.
+    The index maps '{version_guid}-{file}' to the MD5 hash listed in the package manifest.
+    Least recently used packages are removed once the cache grows past MAX_SIZE.
+    """
+
+    _LOG_PREFIX: str = "PackageCache"
+    DIRECTORY: Path = Directories.PACKAGE_CACHE
+    INDEX: Path = Files.PACKAGE_CACHE_INDEX
+    MAX_SIZE: int = 1024 * 1024 * 1024  # 1 GiB
+
+    _lock: Lock = Lock()
+    _key_locks: dict[str, Lock] = {}
+
+
+    @classmethod
+    def get(cls, version_guid: str, file: str, progress_callback: Optional[Callable[[int, int], None]] = None) -> Path:
+        """Returns the path to the cached package, downloading it first if needed. The returned file must not be modified. progress_callback is only called if the package is downloaded"""
+
+        key: str = f"{version_guid}-{file}"
+        with cls._lock:
+            key_lock: Lock = cls._key_locks.setdefault(key, Lock())
+
+        with key_lock:
+            with cls._lock:
+                index: dict[str, dict] = cls._read_index()
+                item: dict | None = index.get("entries", {}).get(key)
+                if item is not None:
+                    path: Path = cls._get_blob_path(item["md5"], file)
+                    if path.is_file() and path.stat().st_size == item.get("size"):
+                        Logger.info(f"Cache hit: {key}", prefix=cls._LOG_PREFIX)
+                        cls._touch(index, key, item["md5"], file, item["size"])
+                        cls._write_index(index)
+                        return path
+
+            package: Package = cls._get_package(version_guid, file)
+            path = cls._get_blob_path(package.md5, file)
+
+            with cls._lock:
+                if path.is_file() and path.stat().st_size == package.size:  # Same package was cached for a different version
+                    Logger.info(f"Cache hit (shared package): {key}", prefix=cls._LOG_PREFIX)
+                    index = cls._read_index()
+                    cls._touch(index, key, package.md5, file, package.size)
+                    cls._write_index(index)
+                    return path
+
+            Logger.info(f"Cache miss: {key}", prefix=cls._LOG_PREFIX)
+            temp: Path = path.with_name(f"{key}.download")
+            filesystem.download(package.source, temp, progress_callback=progress_callback)
+            md5: str = cls._get_md5(temp)
+            if md5 != package.md5:
+                temp.unlink(missing_ok=True)
+                raise ChecksumMismatchError(file, package.md5, md5)
+            temp.replace(path)
+
+            with cls._lock:
+                index = cls._read_index()
+                cls._touch(index, key, package.md5, file, path.stat().st_size)
+                cls._evict(index, keep=path)
+                cls._write_index(index)
+            return path
+
+
+    @classmethod
+    def _get_package(cls, version_guid: str, file: str) -> Package:
+        manifest: PackageManifest = PackageManifest(version_guid)
+        for package in manifest.packages:
+            if package.file == file:
+                return package
+        raise FileNotFoundError(Api.Roblox.Deployment.download(version_guid, file))
+
+
+    @classmethod
+    def _get_blob_path(cls, md5: str, file: str) -> Path:
+        return cls.DIRECTORY / f"{md5}{Path(file).suffix}"
+
+
+    @classmethod
+    def _touch(cls, index: dict, key: str, md5: str, file: str, size: int) -> None:
+        index.setdefault("entries", {})[key] = {"md5": md5, "size": size, "blob": cls._get_blob_path(md5, file).name, "timestamp": time.time()}
+
+
+    @classmethod
+    def _evict(cls, index: dict, keep: Path) -> None:
+        """Removes least recently used packages until the cache fits in MAX_SIZE"""
+
+        entries: dict[str, dict] = index.get("entries", {})
+        blobs: dict[str, dict] = {}  # blob name -> {"size": int, "timestamp": float}
+        for item in entries.values():
+            blob: dict | None = blobs.get(item["blob"])
+            if blob is None:
+                blobs[item["blob"]] = {"size": item["size"], "timestamp": item["timestamp"]}
+            else:
+                blob["timestamp"] = max(blob["timestamp"], item["timestamp"])
+
+        total_size: int = sum(blob["size"] for blob in blobs.values())
+        for name, blob in sorted(blobs.items(), key=lambda item: item[1]["timestamp"]):
+            if total_size <= cls.MAX_SIZE:
+                break
+            if name == keep.name:
+                continue
+
+            Logger.info(f"Evicting package: {name}", prefix=cls._LOG_PREFIX)
+            try:
+                (cls.DIRECTORY / name).unlink(missing_ok=True)
+            except OSError as e:  # e.g. still opened by another generation or update on Windows
+                Logger.warning(f"Unable to evict package '{name}' due to {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+                continue
+            total_size -= blob["size"]
+            for key in [key for key, item in entries.items() if item["blob"] == name]:
+                entries.pop(key)
+
+
+    @classmethod
+    def _read_index(cls) -> dict:
+        if not cls.INDEX.exists():
+            return {}
+        try:
+            with open(cls.INDEX) as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            Logger.warning(f"Unable to read cache index due to {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+            return {}
+
+
+    @classmethod
+    def _write_index(cls, index: dict) -> None:
+        with filesystem.atomic_write(cls.INDEX) as temp, open(temp, "w") as file:
+            json.dump(index, file, indent=4)
+
+
+    @staticmethod
+    def _get_md5(path: Path) -> str:
+        hasher = hashlib.md5()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                hasher.update(chunk)
+        return hasher.hexdigest().upper()
\ No newline at end of file
@@ -1,18 +1,74 @@
-from typing import Literal
+from typing import Literal, NamedTuple
 
-from packaging.version import Version  # type: ignore
 
+class FileVersion(NamedTuple):
+    """Compared as a tuple. Missing components are 0, like packaging.version.Version ignores trailing zeros"""
 
-class RobloxVersion(Version):
+    major: int
+    minor: int
+    patch: int = 0
+    build: int = 0
+
+
+    @classmethod
+    def parse(cls, value: str) -> "FileVersion":
+        components: list[str] = value.strip().split(".")
+        if not 1 <= len(components) <= 4:
+            raise ValueError(f"Invalid file version: '{value}'")
+        return cls._make(map(int, components + ["0"] * (4 - len(components))))
+
+
+    def __str__(self) -> str:
+        return ".".join(str(component) for component in self)
+
+
+class RobloxVersion:
+    """Compact deployment record, ordered by (file_version, binary_type, guid)"""
+
+    __slots__ = ("binary_type", "guid", "file_version")
     binary_type: Literal["WindowsPlayer", "WindowsStudio64"]
     guid: str
-    file_version: Version
+    file_version: FileVersion
 
 
-    def __init__(self, binary_type: Literal["WindowsPlayer", "WindowsStudio64"], guid: str, file_version: Version | str) -> None:
+    def __init__(self, binary_type: Literal["WindowsPlayer", "WindowsStudio64"], guid: str, file_version: FileVersion | str) -> None:
         self.binary_type = binary_type
         self.guid = guid
-        if isinstance(file_version, Version):
+        if isinstance(file_version, FileVersion):
             self.file_version = file_version
         else:
-            self.file_version = Version(file_version)
\ No newline at end of file
+            self.file_version = FileVersion.parse(file_version)
+
+
+    def _key(self) -> tuple[FileVersion, str, str]:
+        return (self.file_version, self.binary_type, self.guid)
+
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RobloxVersion):
+            return NotImplemented
+        return self._key() == other._key()
+
+
+    def __lt__(self, other: "RobloxVersion") -> bool:
+        return self._key() < other._key()
+
+
+    def __le__(self, other: "RobloxVersion") -> bool:
+        return self._key() <= other._key()
+
+
+    def __gt__(self, other: "RobloxVersion") -> bool:
+        return self._key() > other._key()
+
+
+    def __ge__(self, other: "RobloxVersion") -> bool:
+        return self._key() >= other._key()
+
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}({self.binary_type!r}, {self.guid!r}, '{self.file_version}')>"
\ No newline at end of file
@@ -1,5 +1,6 @@
 from .paths import Directories, Files, Resources
-from .extract import extract
+from .extract import extract, extract_filtered, MemberFilter
 from .open import open
 from .download import download
+from .atomic_write import atomic_write
 from .exceptions import *
\ No newline at end of file
@@ -0,0 +1,17 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+import uuid
+
+
+@contextmanager
+def atomic_write(path: Path) -> Iterator[Path]:
+    """Yields a unique temporary file next to path, which replaces path if the block succeeds. Readers, other threads and processes never see a partially written file"""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp: Path = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        yield temp
+        temp.replace(path)
+    finally:
+        temp.unlink(missing_ok=True)
\ No newline at end of file
@@ -1,23 +1,29 @@
 from pathlib import Path
+from typing import Callable, Optional
 import urllib.request
 from urllib.error import HTTPError, URLError, ContentTooShortError
-import time
 
 from modules.logger import Logger
+from modules.profiler import Profiler, Span
 
 
-def download(source: str, destination: Path, attempts: int = 3) -> None:
+def download(source: str, destination: Path, attempts: int = 3, progress_callback: Optional[Callable[[int, int], None]] = None) -> None:
+    """progress_callback receives the downloaded and total size in bytes, the total is -1 if unknown"""
+
     destination.parent.mkdir(parents=True, exist_ok=True)
     temp: Path = destination.with_suffix(".tmp")
+    reporthook: Optional[Callable[[int, int, int], None]] = None
+    if progress_callback is not None:
+        reporthook = lambda block_count, block_size, total_size: progress_callback(block_count * block_size if total_size < 0 else min(block_count * block_size, total_size), total_size)
 
     last_exception: Exception | None = None
 
     for i in range(1, attempts+1):
         try:
-            start: float = time.time()
-            urllib.request.urlretrieve(source, temp)
+            span: Span = Profiler.span(f"DOWNLOAD {source}", category="Network", log=False)
+            urllib.request.urlretrieve(source, temp, reporthook=reporthook)
             temp.replace(destination)
-            duration: float = (time.time() - start) * 1000
+            duration: float = span.end()
             Logger.info(f"DOWNLOAD {source} -> SUCCESS (duration: {duration:.2f}ms)")
             return
 
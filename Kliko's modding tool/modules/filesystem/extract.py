@@ -1,5 +1,7 @@
 from pathlib import Path
+from typing import Callable, Iterable
 from zipfile import ZipFile
+from fnmatch import fnmatchcase
 
 from py7zr import SevenZipFile # type: ignore
 
@@ -28,4 +30,37 @@ def extract(source: str | Path, destination: str | Path, ignore_filetype: bool =
             with SevenZipFile(source, "r") as archive:
                 archive.extractall(destination)
 
-        case other: raise ValueError(f"Unsupported filetype: {other}")
\ No newline at end of file
+        case other: raise ValueError(f"Unsupported filetype: {other}")
+
+
+MemberFilter = str | Callable[[str], bool]
+
+
+def extract_filtered(source: str | Path, destination: str | Path, filters: Iterable[MemberFilter]) -> list[Path]:
+    """Only extracts members that match at least one filter. Strings are glob patterns matched against the full member name. Returns the extracted file paths"""
+
+    source = Path(source).resolve()
+    destination = Path(destination).resolve()
+    filters = tuple(filters)
+
+    if not source.is_file(): raise FileNotFoundError(f"File not found: {source}")
+    if destination.is_file(): raise NotADirectoryError(f"Destination exists but is not a directory: {destination}")
+    if source.suffix != ".zip": raise ValueError(f"Unsupported filetype: {source.suffix}")
+
+    destination.mkdir(parents=True, exist_ok=True)
+    with ZipFile(source, "r") as archive:
+        return [
+            Path(archive.extract(member, destination))
+            for member in archive.infolist()
+            if not member.is_dir() and _matches_any(member.filename, filters)
+        ]
+
+
+def _matches_any(name: str, filters: tuple[MemberFilter, ...]) -> bool:
+    for item in filters:
+        if isinstance(item, str):
+            if fnmatchcase(name, item):
+                return True
+        elif item(name):
+            return True
+    return False
\ No newline at end of file
@@ -73,6 +73,9 @@ class Directories:
     CACHE: Path = ROOT / "cache"
     SHORTCUTS_CACHE: Path = CACHE / "shortcuts"
     SHORTCUTS_DESKTOP_ICON_CACHE: Path = CACHE / "shortcuts" / "desktop_icons"
+    PACKAGE_CACHE: Path = CACHE / "packages"
+    IMAGESETDATA_CACHE: Path = CACHE / "imagesetdata"
+    MASK_CACHE: Path = CACHE / "masks"
     MEIPASS: Optional[Path] = Path(sys._MEIPASS) if FROZEN else None  # type: ignore
     RESOURCES: Path = (MEIPASS if FROZEN else ROOT) / "resources"  # type: ignore
     MOD_GENERATOR_FILES: Path = RESOURCES / "mod_generator_files"
@@ -91,6 +94,8 @@ class Files:
     CONFIG: Path = Directories.CONFIG / "config.json"
     SHORTCUTS_CONFIG: Path = Directories.CONFIG / "shortcuts.json"
     SHORTCUTS_CACHE_INDEX: Path = Directories.SHORTCUTS_CACHE / "index.json"
+    PACKAGE_CACHE_INDEX: Path = Directories.PACKAGE_CACHE / "index.json"
+    DEPLOY_HISTORY_CACHE: Path = Directories.CACHE / "deploy_history.json"
 
 
 class Resources:
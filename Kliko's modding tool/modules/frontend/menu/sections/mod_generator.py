@@ -1,7 +1,8 @@
 from tkinter import TclError, StringVar, BooleanVar, filedialog
-from typing import Literal, Optional, TYPE_CHECKING
+from typing import Literal, Optional, Callable, Any, TYPE_CHECKING
 from pathlib import Path
-from threading import Thread, Event
+from threading import Thread, Event, Condition
+import time
 import uuid
 import json
 import re
@@ -37,6 +38,15 @@ class ModGeneratorSection(ScrollableFrame):
     _custom_mask_preview_size: int = 260
     _addition_icon_preview_size: int = 24
     _gradient_preview_size: int = 148
+    _preview_condition: Condition
+    _preview_requests: dict[str, tuple[int, Callable[[float, Event], Any], Callable[[Any], None], bool, Event]]
+    _preview_generations: dict[str, int]
+    _preview_cancel_events: dict[str, Event]
+    _preview_requested_at: float = 0
+    _preview_thread: Optional[Thread] = None
+    _preview_window: Optional[ModGeneratorPreviewWindow] = None
+    _PREVIEW_DEBOUNCE_MS: int = 40
+    _PREVIEW_DRAFT_SCALE: float = 0.25
 
     color_frame: Frame
     gradient_frame: Frame
@@ -82,6 +92,10 @@ class ModGeneratorSection(ScrollableFrame):
         self._additional_file_frames = {}
         self._gradient_list_frames = {}
         self._stop_event = Event()
+        self._preview_condition = Condition()
+        self._preview_requests = {}
+        self._preview_generations = {}
+        self._preview_cancel_events = {}
         super().__init__(master, transparent=False, round=True, border=True, layer=1)
         self.root = master
         self.grid_columnconfigure(0, weight=1)
@@ -92,6 +106,10 @@ class ModGeneratorSection(ScrollableFrame):
         if self._language_change_callback_id is not None:
             Localizer.remove_callback(self._language_change_callback_id)
             self._language_change_callback_id = None
+        with self._preview_condition:
+            self._preview_requests.clear()
+            for cancel_event in self._preview_cancel_events.values():
+                cancel_event.set()
         return super().destroy()
 
 
@@ -466,6 +484,8 @@ class ModGeneratorSection(ScrollableFrame):
         hex_without_prefix: str = value_hex.removeprefix("#")
         r, g, b = int(hex_without_prefix[0:2], 16), int(hex_without_prefix[2:4], 16), int(hex_without_prefix[4:6], 16)
         self.color_data = (r, g, b)
+        if self.mode == "color":
+            self._update_preview_window()
 # endregion
 
 
@@ -496,11 +516,17 @@ class ModGeneratorSection(ScrollableFrame):
 
     def _update_gradient_preview(self) -> None:
         mode: Literal["gradient"] = "gradient"
-        data: list[GradientColor] = self.gradient_data
+        data: list[GradientColor] = [GradientColor(item.stop, item.color) for item in self.gradient_data]  # Copy, the list is edited while the preview renders
         preview_size: int = self._gradient_preview_size
         angle: float = self.gradient_angle
-        image: CTkImage = get_ctk_image(ModGenerator.generate_preview_mask(mode, data, (preview_size, preview_size), angle), size=preview_size)
-        self.gradient_preview_label.configure(image=image)
+        self._request_preview(
+            "gradient",
+            lambda scale, _: get_ctk_image(ModGenerator.generate_preview_mask(mode, data, (preview_size, preview_size), angle, scale=scale), size=preview_size),
+            lambda image: self.gradient_preview_label.configure(image=image),
+            progressive=True
+        )
+        if self.mode == "gradient":
+            self._update_preview_window()
 
 
     def _update_gradient_list(self) -> None:
@@ -789,16 +815,121 @@ class ModGeneratorSection(ScrollableFrame):
 # endregion
 
 
-# region generate
-    def show_preview(self) -> None:
+# region preview
+    def _request_preview(self, key: str, render: Callable[[float, Event], Any], callback: Callable[[Any], None], progressive: bool = False) -> None:
+        """Renders in a background thread and passes the result to callback on the main loop. Requests are debounced and only the latest request per key is rendered, stale results are dropped.
+        render receives a scale and a cancel event. Progressive requests first render a low resolution draft right away, the full resolution render waits until input settles and is cancelled by newer requests"""
+
+        with self._preview_condition:
+            generation: int = self._preview_generations.get(key, 0) + 1
+            self._preview_generations[key] = generation
+            previous_cancel_event: Optional[Event] = self._preview_cancel_events.get(key)
+            if previous_cancel_event is not None:
+                previous_cancel_event.set()
+            cancel_event: Event = Event()
+            self._preview_cancel_events[key] = cancel_event
+            self._preview_requests[key] = (generation, render, callback, progressive, cancel_event)
+            self._preview_requested_at = time.perf_counter()
+            self._preview_condition.notify()
+
+            if self._preview_thread is None or not self._preview_thread.is_alive():
+                self._preview_thread = Thread(target=self._preview_worker, daemon=True)
+                self._preview_thread.start()
+
+
+    def _preview_worker(self) -> None:
+        debounce: float = self._PREVIEW_DEBOUNCE_MS / 1000
+        while True:
+            with self._preview_condition:
+                while True:
+                    while not self._preview_requests:
+                        self._preview_condition.wait()
+
+                    draft_key: Optional[str] = next((key for key, request in self._preview_requests.items() if request[3]), None)
+                    if draft_key is not None:  # The full resolution render stays queued
+                        key: str = draft_key
+                        generation, render, callback, _, cancel_event = self._preview_requests[key]
+                        self._preview_requests[key] = (generation, render, callback, False, cancel_event)
+                        scale: float = self._PREVIEW_DRAFT_SCALE
+                        break
+
+                    remaining: float = self._preview_requested_at + debounce - time.perf_counter()
+                    if remaining <= 0:
+                        key, (generation, render, callback, _, cancel_event) = self._preview_requests.popitem()
+                        scale = 1
+                        break
+                    self._preview_condition.wait(remaining)
+
+            try: result: Any = render(scale, cancel_event)
+            except Exception as e: result = e
+            if result is None or cancel_event.is_set():  # Superseded by a newer request
+                continue
+
+            try: self.after(0, self._deliver_preview, key, generation, result, callback)
+            except (TclError, RuntimeError): return  # Widget destroyed or main loop stopped
+
+
+    def _deliver_preview(self, key: str, generation: int, result: Any, callback: Callable[[Any], None]) -> None:
+        if generation != self._preview_generations.get(key):  # A newer request is pending
+            return
+
+        if isinstance(result, Exception):
+            self.root.send_banner(
+                title_key="menu.mod_generator.exception.title.unknown",
+                message_key="menu.mod_generator.exception.message.unknown",
+                message_modification=lambda string: Localizer.format(string, {"{exception.type}": f"{type(result).__module__}.{type(result).__qualname__}", "{exception.message}": str(result)}),
+                mode="error", auto_close_after_ms=6000
+            )
+            return
+
+        try: callback(result)
+        except TclError: pass
+
+
+    def _get_preview_render(self) -> Callable[[float, Event], Optional[Image.Image]]:
         mode: Literal['color', 'gradient', 'custom'] = self.mode
         angle: float = self.gradient_angle
-        data: tuple[int, int, int] | list[GradientColor] | Image.Image = self.color_data if mode == "color" else self.gradient_data if mode == "gradient" else self.image_data
+        data: tuple[int, int, int] | list[GradientColor] | Image.Image = self.color_data if mode == "color" else [GradientColor(item.stop, item.color) for item in self.gradient_data] if mode == "gradient" else self.image_data
         custom_roblox_icon: Optional[Image.Image] = self.custom_roblox_icon
-        image: Image.Image = ModGenerator.generate_preview_image(mode=mode, data=data, angle=angle, custom_roblox_icon=custom_roblox_icon)
-        ModGeneratorPreviewWindow(self.root, image)
+        return lambda scale, cancel_event: ModGenerator.generate_preview_image(mode=mode, data=data, angle=angle, custom_roblox_icon=custom_roblox_icon, scale=scale, stop_event=cancel_event)
+
+
+    def _get_preview_window(self) -> Optional[ModGeneratorPreviewWindow]:
+        window: Optional[ModGeneratorPreviewWindow] = self._preview_window
+        if window is None:
+            return None
+        try:
+            if window.winfo_exists():
+                return window
+        except TclError: pass
+        self._preview_window = None
+        return None
+
+
+    def _update_preview_window(self) -> None:
+        """Keeps an open preview window in sync while the color or gradient is being edited"""
+
+        window: Optional[ModGeneratorPreviewWindow] = self._get_preview_window()
+        if window is not None:
+            self._request_preview("window", self._get_preview_render(), window.set_image, progressive=True)
 
 
+    def show_preview(self) -> None:
+        window: Optional[ModGeneratorPreviewWindow] = self._get_preview_window()
+        if window is not None:
+            self._request_preview("window", self._get_preview_render(), window.set_image)
+            window.lift()
+            window.focus()
+            return
+
+        def open_window(image: Image.Image) -> None:
+            self._preview_window = ModGeneratorPreviewWindow(self.root, image)
+
+        self._request_preview("window", self._get_preview_render(), open_window)
+# endregion
+
+
+# region generate
     def cancel_generation(self) -> None:
         if self.generating:
             self._stop_event.set()
@@ -3,13 +3,14 @@ import shutil
 from pathlib import Path
 from threading import Thread
 from typing import Literal, TYPE_CHECKING
+import os
 
 from modules.project_data import ProjectData
 from modules.frontend.widgets import ScrollableFrame, Frame, Label, Button, FlexBox
 from modules.frontend.functions import get_ctk_image
 from modules.localization import Localizer
 from modules.filesystem import Resources, Directories
-from modules.mod_updater import ModUpdater
+from modules.mod_updater import ModUpdater, UpdateResult
 from modules.interfaces.config import ConfigInterface
 from modules.deployments import LatestVersion
 from modules import filesystem
@@ -101,6 +102,9 @@ class ModUpdaterSection(ScrollableFrame):
         if Directories.FISHSTRAP_MOD.is_dir():
             fishstrap_frame: Frame = wrapper.add_item()
             self._create_fishstrap_frame(fishstrap_frame)
+
+        batch_frame: Frame = wrapper.add_item()
+        self._create_batch_frame(batch_frame)
 # endregion
 
 
@@ -145,6 +149,20 @@ class ModUpdaterSection(ScrollableFrame):
         button: Button = Button(wrapper, "menu.mod_updater.content.button.update", secondary=True, image=image, command=lambda:Thread(target=lambda:self.update_mod(Directories.FISHSTRAP_MOD, "fishstrap"), daemon=True).start())
         button.grid(column=0, row=1, sticky="ew", pady=self._ENTRY_INNER_GAP)
         self._update_buttons.append(button)
+
+
+    def _create_batch_frame(self, frame: Frame) -> None:
+        frame.grid_columnconfigure(0, weight=1)
+        frame.grid_rowconfigure(0, weight=1)
+        wrapper: Frame = Frame(frame, transparent=True)
+        wrapper.grid_columnconfigure(0, weight=1)
+        wrapper.grid(column=0, row=0, sticky="nsew", padx=self._ENTRY_PADDING[0], pady=self._ENTRY_PADDING[1])
+
+        Label(wrapper, "menu.mod_updater.content.batch_mode", style="body_strong", autowrap=False).grid(column=0, row=0, sticky="ew")
+        image: CTkImage = get_ctk_image(Resources.Common.Light.START, Resources.Common.Dark.START, 24)
+        button: Button = Button(wrapper, "menu.mod_updater.content.button.update", secondary=True, image=image, command=self.select_directory_to_update)
+        button.grid(column=0, row=1, sticky="ew", pady=self._ENTRY_INNER_GAP)
+        self._update_buttons.append(button)
 # endregion
 
 
@@ -213,8 +231,8 @@ class ModUpdaterSection(ScrollableFrame):
             return
 
         try:
-            if mode == "normal":
-                output_path: Path = Directories.OUTPUT_DIR_UPDATER / path.name
+            output_path: Path = Directories.OUTPUT_DIR_UPDATER / path.name
+            if mode == "normal" and output_path.resolve() != path.resolve():  # Mods that are already in the output directory are updated in place
                 if output_path.exists():
                     shutil.rmtree(output_path)
                 output_path.mkdir(parents=True, exist_ok=True)
@@ -269,4 +287,81 @@ class ModUpdaterSection(ScrollableFrame):
         self.updating = False
         for button in self._update_buttons:
             button.configure(key="menu.mod_updater.content.button.update")
+
+
+    def select_directory_to_update(self) -> None:
+        if self.updating:
+            self.root.send_banner(
+                title_key="menu.mod_updater.exception.title.update",
+                message_key="menu.mod_updater.exception.message.generator_busy",
+                mode="warning", auto_close_after_ms=6000
+            )
+            return
+
+        directory: str | Literal[""] = filedialog.askdirectory(
+            initialdir=str(Directories.DOWNLOADS),
+            title=Localizer.format(Localizer.Strings["menu.mod_updater.filedialog.title_batch"], {"{app.name}": ProjectData.NAME})
+        )
+
+        if directory:
+            Thread(target=lambda: self.update_mods_in_directory(Path(directory).resolve()), daemon=True).start()  # type: ignore
+
+
+    def update_mods_in_directory(self, path: Path) -> None:
+        """Updates every mod in path, each distinct mod version is only downloaded once"""
+
+        Logger.info("Running batch mod updater...", prefix=self._LOG_PREFIX)
+        if self.updating:
+            self.root.send_banner(
+                title_key="menu.mod_updater.exception.title.update",
+                message_key="menu.mod_updater.exception.message.generator_busy",
+                mode="warning", auto_close_after_ms=6000
+            )
+            return
+
+        mods: list[Path] = ModUpdater.find_mods(path)
+        if not mods:
+            self.root.send_banner(
+                title_key="menu.mod_updater.exception.title.update",
+                message_key="menu.mod_updater.exception.message.no_mods_found",
+                mode="warning", auto_close_after_ms=6000
+            )
+            return
+
+        self.updating = True
+        for button in self._update_buttons:
+            button.configure(key="menu.mod_updater.content.button.updating")
+
+        try:
+            latest_version: LatestVersion = LatestVersion("WindowsStudio64")
+            results: list[UpdateResult] = ModUpdater.update_mods(mods, latest_version, output_dir=Directories.OUTPUT_DIR_UPDATER, workers=os.cpu_count() or 1)
+
+        except Exception as e:
+            self.root.send_banner(
+                title_key="menu.mod_updater.exception.title.update",
+                message_key="menu.mod_updater.exception.message.unknown",
+                message_modification=lambda string: Localizer.format(string, {"{exception.type}": f"{type(e).__module__}.{type(e).__qualname__}", "{exception.message}": str(e)}),
+                mode="error", auto_close_after_ms=6000
+            )
+
+        else:
+            updated: int = sum(1 for result in results if result.status == "updated")
+            up_to_date: int = sum(1 for result in results if result.status == "up_to_date")
+            failed: int = len(results) - updated - up_to_date
+            for result in results:
+                if result.status in {"incompatible", "failed"}:
+                    Logger.warning(f"Unable to update mod ({result.status}): '{result.mod.name}'", prefix=self._LOG_PREFIX)
+
+            self.root.send_banner(
+                title_key="menu.mod_updater.success.title.update_batch",
+                message_key="menu.mod_updater.success.message.update_batch",
+                message_modification=lambda string: Localizer.format(string, {"{count.updated}": str(updated), "{count.up_to_date}": str(up_to_date), "{count.failed}": str(failed)}),
+                mode="warning" if failed else "success", auto_close_after_ms=6000 if failed else 4000
+            )
+            if updated and ConfigInterface.get("open_dir_after_update"):
+                filesystem.open(Directories.OUTPUT_DIR_UPDATER)
+
+        self.updating = False
+        for button in self._update_buttons:
+            button.configure(key="menu.mod_updater.content.button.update")
 # endregion
\ No newline at end of file
@@ -45,6 +45,12 @@ class ModGeneratorPreviewWindow(Toplevel):
         ScalingTracker.add_window(self._on_scaling_change, self)
 
 
+    def set_image(self, image: Image.Image) -> None:
+        """Low resolution drafts are scaled up to the size of the first image"""
+
+        self.label.configure(image=get_ctk_image(image, size=self.image.size))
+
+
     def center_window(self) -> None:
         self.update_idletasks()
         width: int = int(self.winfo_reqwidth() / ScalingTracker.get_window_scaling(self))
@@ -0,0 +1,3 @@
+from .parser import IconRecord, parse_imagesetdata
+from .cache import ImageSetDataCache
+from .locate import IMAGESETDATA_NAME, IMAGESET_NAME, locate_imagesets, locate_imagesetdata, locate_imagesets_member, locate_imagesetdata_member
\ No newline at end of file
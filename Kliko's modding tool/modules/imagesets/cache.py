@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import Optional
+from threading import Lock
+import hashlib
+import json
+
+from modules.logger import Logger
+from modules.filesystem import Directories, atomic_write
+
+from .parser import IconRecord, parse_imagesetdata
+
+
+class ImageSetDataCache:
+    """
+    Parsed GetImageSetData.lua files, cached in memory and on disk.
+
+    Files are stored in Directories.IMAGESETDATA_CACHE as '{version_guid}-{MD5 of the file content}.json'.
+    Only the LIMIT most recently written files are kept.
+    """
+
+    _LOG_PREFIX: str = "ImageSetDataCache"
+    DIRECTORY: Path = Directories.IMAGESETDATA_CACHE
+    LIMIT: int = 16
+
+    _lock: Lock = Lock()
+    _records: dict[str, dict[str, list[IconRecord]]] = {}  # In-memory copy of the on-disk cache
+
+
+    @classmethod
+    def get(cls, content: str, version_guid: Optional[str] = None) -> dict[str, list[IconRecord]]:
+        """Returns the icon records of every size. If version_guid is None, content is parsed without caching"""
+
+        if version_guid is None:
+            return parse_imagesetdata((content,))
+
+        key: str = f"{version_guid}-{hashlib.md5(content.encode()).hexdigest().upper()}"
+        with cls._lock:
+            records: Optional[dict[str, list[IconRecord]]] = cls._records.get(key)
+        if records is not None:
+            return records
+
+        path: Path = cls.DIRECTORY / f"{key}.json"
+        records = cls._read(path)
+        if records is None:
+            records = parse_imagesetdata((content,))
+            cls._write(path, records)
+
+        with cls._lock:
+            cls._records[key] = records
+        return records
+
+
+    @classmethod
+    def _read(cls, path: Path) -> Optional[dict[str, list[IconRecord]]]:
+        if not path.is_file():
+            return None
+        try:
+            with open(path) as file:
+                data: dict[str, list[list]] = json.load(file)
+            records: dict[str, list[IconRecord]] = {size: [tuple(icon) for icon in icons] for size, icons in data.items()}  # type: ignore
+            if any(len(icon) != 6 for icons in records.values() for icon in icons):
+                raise ValueError("Invalid icon record")
+            return records
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            Logger.warning(f"Unable to read cached {path.name} due to {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+            return None
+
+
+    @classmethod
+    def _write(cls, path: Path, records: dict[str, list[IconRecord]]) -> None:
+        try:
+            with atomic_write(path) as temp, open(temp, "w") as file:
+                json.dump(records, file, separators=(",", ":"))
+
+            cached_files: list[Path] = sorted(path.parent.glob("*.json"), key=lambda item: item.stat().st_mtime, reverse=True)
+            for old_file in cached_files[cls.LIMIT:]:
+                old_file.unlink(missing_ok=True)
+
+        except OSError as e:
+            Logger.warning(f"Unable to cache {path.name} due to {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
\ No newline at end of file
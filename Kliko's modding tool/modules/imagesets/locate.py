@@ -0,0 +1,41 @@
+from pathlib import Path
+from typing import Iterable
+import os
+
+
+IMAGESETDATA_NAME: str = "GetImageSetData.lua"
+IMAGESET_NAME: str = "img_set_1x_1.png"
+
+
+def locate_imagesets(base_dir: Path) -> Path:
+    for (root, dirs, files) in os.walk(base_dir):
+        if IMAGESET_NAME in files:
+            return Path(root).resolve()
+
+    raise FileNotFoundError("Could not find ImageSets")
+
+
+def locate_imagesetdata(base_dir: Path) -> Path:
+    for (root, dirs, files) in os.walk(base_dir):
+        if IMAGESETDATA_NAME in files:
+            return Path(root, IMAGESETDATA_NAME).resolve()
+
+    raise FileNotFoundError(IMAGESETDATA_NAME)
+
+
+def locate_imagesets_member(names: Iterable[str]) -> str:
+    """Returns the directory inside an archive that contains the ImageSets, including the trailing '/'"""
+
+    for name in names:
+        if name == IMAGESET_NAME or name.endswith(f"/{IMAGESET_NAME}"):
+            return name.removesuffix(IMAGESET_NAME)
+
+    raise FileNotFoundError("Could not find ImageSets")
+
+
+def locate_imagesetdata_member(names: Iterable[str]) -> str:
+    for name in names:
+        if name == IMAGESETDATA_NAME or name.endswith(f"/{IMAGESETDATA_NAME}"):
+            return name
+
+    raise FileNotFoundError(IMAGESETDATA_NAME)
\ No newline at end of file
@@ -0,0 +1,60 @@
+from typing import Iterable
+import re
+
+
+IconRecord = tuple[str, str, int, int, int, int]  # name, image_set, x, y, w, h
+
+
+_TOKEN_PATTERN: re.Pattern = re.compile(
+    r"function make_assets_(?P<size>\dx)\(\)"
+    r"|(?P<end>\} end)"
+    r"|\['(?P<name>[^']+)'\] = \{ ImageRectOffset = Vector2\.new\((?P<x>\d+), (?P<y>\d+)\), ImageRectSize = Vector2\.new\((?P<w>\d+), (?P<h>\d+)\), ImageSet = '(?P<image_set>[^']+)' \}(?P<close>(?= end))?"
+)
+_STREAM_OVERLAP: int = 64 * 1024  # Must be longer than any single token
+
+
+def parse_imagesetdata(chunks: Iterable[str]) -> dict[str, list[IconRecord]]:
+    """
+    Single-pass scanner for GetImageSetData.lua, chunks can be the whole file content or a streamed file.
+    Icons are only collected between 'function make_assets_Nx()' and the first '} end' after it.
+    Duplicate icon names within a size keep the position of the first and the data of the last occurrence.
+    """
+
+    icon_map: dict[str, dict[str, IconRecord]] = {}
+    current: dict[str, IconRecord] | None = None
+
+    def handle(match: re.Match) -> None:
+        nonlocal current
+        size: str | None = match["size"]
+        if size is not None:
+            current = icon_map.setdefault(size, {})
+            return
+
+        if current is None:
+            return
+
+        name: str | None = match["name"]
+        if name is not None:
+            current[name] = (name, match["image_set"], int(match["x"]), int(match["y"]), int(match["w"]), int(match["h"]))
+            if match["close"] is None:
+                return
+        current = None
+
+    buffer: str = ""
+    for chunk in chunks:
+        buffer += chunk
+        limit: int = len(buffer) - _STREAM_OVERLAP
+        position: int = 0
+        for match in _TOKEN_PATTERN.finditer(buffer):
+            if match.end() > limit:
+                break
+            handle(match)
+            position = match.end()
+        else:
+            position = max(position, limit)
+        buffer = buffer[position:]
+
+    for match in _TOKEN_PATTERN.finditer(buffer):
+        handle(match)
+
+    return {size: list(icons.values()) for size, icons in icon_map.items()}
\ No newline at end of file
@@ -17,7 +17,9 @@ class Logger:
     _initialized: bool = False
 
     @classmethod
-    def initialize(cls) -> None:
+    def initialize(cls, console: bool = False) -> None:
+        """If console is True, info and higher is also printed to stdout"""
+
         if cls._initialized: raise RuntimeError("Logger has already been initialized.")
         DIRECTORY.mkdir(parents=True, exist_ok=True)
 
@@ -36,6 +38,12 @@ class Logger:
         logging.getLogger("urllib3").setLevel(logging.WARNING)
         logging.getLogger("pyi_splash").setLevel(logging.WARNING)
 
+        if console:
+            handler: logging.StreamHandler = logging.StreamHandler(sys.stdout)
+            handler.setLevel(logging.INFO)
+            handler.setFormatter(logging.Formatter("%(levelname)-8s | %(message)s"))
+            logging.getLogger().addHandler(handler)
+
         cls._initialized = True
 
 
@@ -1,21 +1,28 @@
 from typing import Literal, Optional
-from pathlib import Path
-from tempfile import TemporaryDirectory
-from threading import Event
+from pathlib import Path, PurePosixPath
+from zipfile import ZipFile, ZipInfo
+from io import BytesIO
+from threading import Event, Lock
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+import os
 import shutil
+import uuid
 import json
+import hashlib
 import re
 
 from modules.logger import Logger
-from modules import filesystem
-from modules.deployments import RobloxVersion, LatestVersion, DeployHistory
+from modules.profiler import Profiler, Span
+from modules.deployments import RobloxVersion, LatestVersion, DeployHistory, PackageCache
 from modules.networking import requests, Response, Api
+from modules.imagesets import locate_imagesets_member, locate_imagesetdata_member, IMAGESETDATA_NAME
 
-from .utils import MaskStorage, locate_imagesets, locate_imagesetdata, ImageSetData, ImageSet, ImageSetIcon
-from .dataclasses import IconBlacklist, RemoteConfig, AdditionalFile, GradientColor
+from .utils import MaskStorage, ImageSetData, ImageSet, ImageSetIcon
+from .dataclasses import IconBlacklist, RemoteConfig, AdditionalFile, GradientColor, GeneratorJob
 from .exceptions import *
 
 from PIL import Image, PngImagePlugin  # type: ignore
+import numpy as np  # type: ignore
 
 
 PREVIEW_DATA_DIR: Path = Path(__file__).parent / "preview_data"
@@ -23,6 +30,10 @@ PREVIEW_DATA_DIR: Path = Path(__file__).parent / "preview_data"
 
 class ModGenerator:
     _LOG_PREFIX: str = "ModGenerator"
+    _FINGERPRINT_KEY: str = "generatorFingerprint"  # info.json key, ModUpdater removes it from updated mods
+    _FINGERPRINT_VERSION: int = 1
+    _preview_data: dict[float, tuple[Image.Image, Image.Image, Image.Image, np.ndarray, np.ndarray]] = {}
+    _preview_lock: Lock = Lock()
 
 
     @classmethod
@@ -36,44 +47,119 @@ class ModGenerator:
 
 
     @classmethod
-    def generate_preview_mask(cls, mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image, size: tuple[int, int], angle: Optional[float] = None)  -> Image.Image:
+    def generate_preview_mask(cls, mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image, size: tuple[int, int], angle: Optional[float] = None, scale: float = 1)  -> Image.Image:
+        """A scale below 1 renders a cheaper low resolution draft, the returned image is size * scale"""
+
         cls._validate_data(mode, data)
+        if scale < 1:
+            width, height = size
+            size = (max(1, round(width * scale)), max(1, round(height * scale)))
         return cls.get_mask(mode, data, size, angle, dont_cache=True)
 
 
     @classmethod
-    def generate_preview_image(cls, mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image, angle: Optional[float] = None, custom_roblox_icon: Optional[Image.Image] = None)  -> Image.Image:
+    def generate_preview_image(cls, mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image, angle: Optional[float] = None, custom_roblox_icon: Optional[Image.Image] = None, scale: float = 1, stop_event: Optional[Event] = None)  -> Optional[Image.Image]:
+        """A scale below 1 renders a cheaper low resolution draft from a downscaled atlas, the returned image is the atlas size * scale. Returns None if stop_event was set before the image was finished"""
+
         cls._validate_data(mode, data)
+        atlas, alpha, rect_mask, rects, roblox_rects = cls._get_preview_data(min(scale, 1))
 
-        index: Path = PREVIEW_DATA_DIR / "index.json"
-        with open(index) as file:
-            icon_data: list[str] = json.load(file)
-
-        image: Image.Image = Image.open(PREVIEW_DATA_DIR / "image.png", formats=["PNG"])
-        if image.mode != "RGBA":
-            image = image.convert("RGBA")
-
-        for item in icon_data:
-            icon_name, icon_position, icon_size = item.split()
-            icon_position = icon_position.split("x")  # type: ignore
-            icon_size = icon_size.split("x")  # type: ignore
-            icon_x: int = int(icon_position[0])
-            icon_y: int = int(icon_position[1])
-            icon_w: int = int(icon_size[0])
-            icon_h: int = int(icon_size[1])
-
-            if custom_roblox_icon is not None and icon_name == "roblox":
-                custom_icon_resized: Image.Image = custom_roblox_icon.resize((icon_w, icon_h), resample=Image.Resampling.LANCZOS)
-                image.paste(custom_icon_resized, (icon_x, icon_y))
-            else:
-                icon: Image.Image = image.crop((icon_x, icon_y, icon_x + icon_w, icon_y + icon_h))
-                cls.apply_mask(icon, mode, data, angle)
-                image.paste(icon, (icon_x, icon_y))
-        MaskStorage.cache.clear()
+        # Masks are drawn onto a single atlas-sized layer and composited in one pass, only inside the icon rects
+        if mode == "color":
+            layer: Image.Image = Image.new("RGB", atlas.size, tuple(data))  # type: ignore
+        else:
+            layer = Image.new("RGBA" if mode == "custom" else "RGB", atlas.size)
+            masks: dict[tuple[int, int], Image.Image] = {}
+            for x, y, w, h in rects.tolist():
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                mask: Image.Image | None = masks.get((w, h))
+                if mask is None:
+                    mask = masks[(w, h)] = cls.get_mask(mode, data, (w, h), angle)
+                layer.paste(mask, (x, y))
+
+            if mode == "custom":
+                layer = Image.alpha_composite(atlas, layer)
+        layer.putalpha(alpha)
+
+        image: Image.Image = atlas.copy()
+        image.paste(layer, (0, 0), rect_mask)
+        if custom_roblox_icon is not None:
+            for x, y, w, h in roblox_rects.tolist():
+                image.paste(custom_roblox_icon.resize((w, h), resample=Image.Resampling.LANCZOS), (x, y))
 
+        if stop_event is not None and stop_event.is_set():
+            return None
         return image
 
 
+    @classmethod
+    def _get_preview_data(cls, scale: float = 1) -> tuple[Image.Image, Image.Image, Image.Image, np.ndarray, np.ndarray]:
+        """Decodes the preview atlas and parses its icon rects once per scale. Returns the atlas, its alpha channel, the icon rect mask, and (x, y, w, h) tables of all icons and of the Roblox logo icons"""
+
+        data: Optional[tuple[Image.Image, Image.Image, Image.Image, np.ndarray, np.ndarray]] = cls._preview_data.get(scale)
+        if data is not None:
+            return data
+        if scale != 1:
+            return cls._get_scaled_preview_data(scale)
+
+        with cls._preview_lock:
+            data = cls._preview_data.get(scale)
+            if data is not None:
+                return data
+
+            with open(PREVIEW_DATA_DIR / "index.json") as file:
+                icon_data: list[str] = json.load(file)
+
+            atlas: Image.Image = Image.open(PREVIEW_DATA_DIR / "image.png", formats=["PNG"])
+            atlas = atlas.convert("RGBA") if atlas.mode != "RGBA" else atlas.copy()  # copy() loads the image and closes the file
+
+            names: list[str] = []
+            rect_list: list[tuple[int, int, int, int]] = []
+            for item in icon_data:
+                icon_name, icon_position, icon_size = item.split()
+                icon_x, icon_y = (int(value) for value in icon_position.split("x"))
+                icon_w, icon_h = (int(value) for value in icon_size.split("x"))
+                names.append(icon_name)
+                rect_list.append((icon_x, icon_y, icon_w, icon_h))
+            rects: np.ndarray = np.array(rect_list, dtype=np.int32).reshape(-1, 4)
+
+            rect_mask: Image.Image = Image.new("L", atlas.size, 0)
+            for x, y, w, h in rect_list:
+                rect_mask.paste(255, (x, y, x + w, y + h))
+
+            roblox_rects: np.ndarray = rects[[name == "roblox" for name in names]] if names else rects
+            data = cls._preview_data[scale] = (atlas, atlas.getchannel("A"), rect_mask, rects, roblox_rects)
+            return data
+
+
+    @classmethod
+    def _get_scaled_preview_data(cls, scale: float) -> tuple[Image.Image, Image.Image, Image.Image, np.ndarray, np.ndarray]:
+        full_atlas, _, _, full_rects, full_roblox_rects = cls._get_preview_data()
+
+        with cls._preview_lock:
+            data: Optional[tuple[Image.Image, Image.Image, Image.Image, np.ndarray, np.ndarray]] = cls._preview_data.get(scale)
+            if data is not None:
+                return data
+
+            atlas_size: tuple[int, int] = (max(1, round(full_atlas.width * scale)), max(1, round(full_atlas.height * scale)))
+            atlas: Image.Image = full_atlas.resize(atlas_size, resample=Image.Resampling.BOX)
+
+            def scale_rects(rects: np.ndarray) -> np.ndarray:
+                scaled: np.ndarray = np.empty_like(rects)
+                scaled[:, :2] = np.floor(rects[:, :2] * scale)
+                scaled[:, 2:] = np.maximum(1, np.round(rects[:, 2:] * scale))
+                return scaled
+
+            rects: np.ndarray = scale_rects(full_rects)
+            rect_mask: Image.Image = Image.new("L", atlas.size, 0)
+            for x, y, w, h in rects.tolist():
+                rect_mask.paste(255, (x, y, x + w, y + h))
+
+            data = cls._preview_data[scale] = (atlas, atlas.getchannel("A"), rect_mask, rects, scale_rects(full_roblox_rects))
+            return data
+
+
     @classmethod
     def _validate_data(cls, mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image) -> None:
         match mode:
@@ -134,22 +220,197 @@ class ModGenerator:
 
 
     @classmethod
-    def generate_mod(cls, mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image, output_dir: str | Path, angle: Optional[float] = None, file_version: Optional[int] = None, use_remote_config: bool = True, icon_sizes: Literal[0, 1, 2, 3] = 0, custom_roblox_icon: Optional[Image.Image] = None, additional_files: Optional[list[AdditionalFile]] = None, stop_event: Optional[Event] = None) -> bool:
-        """Returns True if the mod was generated, False if it was cancelled (stop_event.is_set())"""
+    def apply_mask_to_imageset(cls, image: Image.Image, icons: list[ImageSetIcon], mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image, angle: Optional[float] = None) -> Image.Image:
+        """Returns a new image with the mask applied to every icon rect. Assumes image has mode RGBA and data has been validated"""
+
+        sheet: np.ndarray = np.asarray(image, dtype=np.uint8)
+        height, width = sheet.shape[:2]
+        rect_mask: np.ndarray = np.zeros((height, width), dtype=bool)
+        layer: np.ndarray = np.zeros((height, width, 4 if mode == "custom" else 3), dtype=np.uint8)
+
+        for icon in icons:
+            x0, y0 = max(icon.x, 0), max(icon.y, 0)
+            x1, y1 = min(icon.x + icon.w, width), min(icon.y + icon.h, height)
+            if x0 >= x1 or y0 >= y1:
+                continue
+
+            rect_mask[y0:y1, x0:x1] = True
+            if mode == "color":
+                layer[y0:y1, x0:x1] = data
+            else:
+                mask: np.ndarray = np.asarray(cls.get_mask(mode, data, (icon.w, icon.h), angle), dtype=np.uint8)
+                layer[y0:y1, x0:x1] = mask[y0 - icon.y:y1 - icon.y, x0 - icon.x:x1 - icon.x, :layer.shape[2]]
+
+        if mode == "custom":
+            layer = np.asarray(Image.alpha_composite(image, Image.fromarray(layer, "RGBA")), dtype=np.uint8)
+
+        result: np.ndarray = sheet.copy()
+        result[..., :3] = np.where(rect_mask[..., None], layer[..., :3], sheet[..., :3])
+        return Image.fromarray(result, "RGBA")
+
+
+    @classmethod
+    def _generate_imageset(cls, archive_path: Path, member: str, outputs: list[tuple[Path, Literal["color", "gradient", "custom"], tuple[int, int, int] | list[GradientColor] | Image.Image, float]], masked_icons: list[ImageSetIcon], roblox_logo_icons: list[ImageSetIcon], custom_roblox_icon: Optional[Image.Image], metadata: PngImagePlugin.PngInfo) -> None:
+        """Decodes the ImageSet straight from the archive once and writes one result per (target, mode, data, angle) output. Runs inside worker processes, so it must not log"""
+
+        with Profiler.span(PurePosixPath(member).name, category=cls._LOG_PREFIX, outputs=len(outputs)):
+            with ZipFile(archive_path, "r") as archive:
+                source: bytes = archive.read(member)
+
+            with Image.open(BytesIO(source), formats=("PNG",)) as imageset_image_object:
+                if imageset_image_object.mode != "RGBA":
+                    imageset_image_object = imageset_image_object.convert("RGBA")
+
+                roblox_logos: list[tuple[ImageSetIcon, Image.Image]] = [(icon, custom_roblox_icon.resize((icon.w, icon.h), resample=Image.Resampling.LANCZOS)) for icon in roblox_logo_icons]  # type: ignore
+                for target, mode, data, angle in outputs:
+                    result: Image.Image = cls.apply_mask_to_imageset(imageset_image_object, masked_icons, mode=mode, data=data, angle=angle)
+                    for icon, roblox_logo in roblox_logos:
+                        result.paste(roblox_logo, (icon.x, icon.y))
+                    result.save(target, format="PNG", pnginfo=metadata)
+
+
+    @classmethod
+    def _generate_imageset_in_worker(cls, *args) -> list[dict]:
+        """Same as _generate_imageset, returns the profiler events recorded in the worker process"""
+
+        cls._generate_imageset(*args)
+        return Profiler.collect()
+
+
+    @classmethod
+    def _split_icons(cls, imageset: ImageSet, blacklist: IconBlacklist, custom_roblox_icon: Optional[Image.Image]) -> tuple[list[ImageSetIcon], list[ImageSetIcon]]:
+        """Returns the icons to mask and the icons to replace with custom_roblox_icon"""
+
+        ROBLOX_LOGO_NAME: str = "icons/logo/block"
+        masked_icons: list[ImageSetIcon] = []
+        roblox_logo_icons: list[ImageSetIcon] = []
+        for icon in imageset.icons:
+            if cls._is_icon_blacklisted(icon.name, blacklist):
+                continue
+
+            if custom_roblox_icon is not None and icon.name == ROBLOX_LOGO_NAME:
+                roblox_logo_icons.append(icon)
+            else:
+                masked_icons.append(icon)
+        return masked_icons, roblox_logo_icons
+
+
+    @staticmethod
+    def _get_imageset_signature(info: ZipInfo, masked_icons: list[ImageSetIcon], roblox_logo_icons: list[ImageSetIcon]) -> tuple:
+        """Two ImageSets with the same signature produce the same output with the same settings"""
+
+        return (
+            info.CRC, info.file_size,
+            tuple((icon.name, icon.x, icon.y, icon.w, icon.h) for icon in masked_icons),
+            tuple((icon.name, icon.x, icon.y, icon.w, icon.h) for icon in roblox_logo_icons)
+        )
+
+
+    @classmethod
+    def _get_fingerprint(cls, job: GeneratorJob, icon_sizes: Literal[0, 1, 2, 3], blacklist: IconBlacklist, custom_roblox_icon: Optional[Image.Image]) -> str:
+        """Digest of every setting that affects the generated ImageSets. Assumes job.data has been validated"""
+
+        match job.mode:
+            case "color": data: object = list(job.data)  # type: ignore
+            case "gradient": data = [[float(gradient_color.stop), list(gradient_color.color)] for gradient_color in job.data]  # type: ignore
+            case "custom": data = cls._get_image_digest(job.data)  # type: ignore
+
+        settings: dict = {
+            "version": cls._FINGERPRINT_VERSION,
+            "mode": job.mode,
+            "data": data,
+            "angle": float(job.angle or 0),
+            "icon_sizes": icon_sizes,
+            "blacklist": {
+                "prefixes": sorted(set(blacklist.prefixes)),
+                "suffixes": sorted(set(blacklist.suffixes)),
+                "keywords": sorted(set(blacklist.keywords)),
+                "strict": sorted(set(blacklist.strict))
+            },
+            "custom_roblox_icon": cls._get_image_digest(custom_roblox_icon) if custom_roblox_icon is not None else None
+        }
+        return hashlib.sha256(json.dumps(settings, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+    @staticmethod
+    def _get_image_digest(image: Image.Image) -> str:
+        return hashlib.sha256(f"{image.mode}:{image.width}x{image.height}:".encode() + image.tobytes()).hexdigest()
+
+
+    @classmethod
+    def _get_base_imagesets(cls, base_mod: Path, fingerprint: str, icon_sizes: Literal[0, 1, 2, 3], blacklist: IconBlacklist, custom_roblox_icon: Optional[Image.Image]) -> dict[str, tuple[Path, tuple]]:
+        """Maps the ImageSets of an existing generated mod to their output path and signature. Returns an empty dict if the base mod was not generated with the same settings"""
+
+        with open(base_mod / "info.json") as file:
+            base_info: dict = json.load(file)
+        base_guid: str = base_info["clientVersionUpload"]
+        if base_info.get(cls._FINGERPRINT_KEY) != fingerprint:
+            Logger.warning(f"Base mod '{base_mod.name}' was not generated with the same settings, generating every ImageSet...", prefix=cls._LOG_PREFIX)
+            return {}
+
+        Logger.info(f"Downloading base mod ImageSets ({base_guid})...", prefix=cls._LOG_PREFIX)
+        base_luapackages: Path = PackageCache.get(base_guid, "extracontent-luapackages.zip")
+
+        with ZipFile(base_luapackages, "r") as archive:
+            zip_infos: dict[str, ZipInfo] = {info.filename: info for info in archive.infolist()}
+            imagesetdata_member: str = locate_imagesetdata_member(list(zip_infos))
+            imagesets_member_dir: str = locate_imagesets_member(list(zip_infos))
+            base_imageset_path: Path = base_mod / "ExtraContent" / "Luapackages" / PurePosixPath(imagesets_member_dir)
+            image_set_data: ImageSetData = ImageSetData.from_content(archive.read(imagesetdata_member).decode(), base_imageset_path, icon_sizes=icon_sizes, version_guid=base_guid)
+
+        base_imagesets: dict[str, tuple[Path, tuple]] = {}
+        for imageset in image_set_data.imagesets:
+            info: ZipInfo | None = zip_infos.get(f"{imagesets_member_dir}{imageset.path.name}")
+            if info is None or not imageset.path.is_file():
+                continue
+            base_imagesets[imageset.path.name] = (imageset.path, cls._get_imageset_signature(info, *cls._split_icons(imageset, blacklist, custom_roblox_icon)))
+        return base_imagesets
+
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path) -> None:
+        try: os.link(source, target)
+        except OSError: shutil.copy2(source, target)
+
+
+    @classmethod
+    def generate_mod(cls, mode: Literal["color", "gradient", "custom"], data: tuple[int, int, int] | list[GradientColor] | Image.Image, output_dir: str | Path, angle: Optional[float] = None, file_version: Optional[int] = None, use_remote_config: bool = True, icon_sizes: Literal[0, 1, 2, 3] = 0, custom_roblox_icon: Optional[Image.Image] = None, additional_files: Optional[list[AdditionalFile]] = None, stop_event: Optional[Event] = None, workers: int = 1, base_mod: Optional[str | Path] = None) -> bool:
+        """Returns True if the mod was generated, False if it was cancelled (stop_event.is_set()). ImageSets are generated in a process pool if workers > 1
+        If base_mod is an existing mod generated with the same settings, ImageSets that are unchanged since its version are linked or copied instead of generated again.
+        The settings are compared with the fingerprint in its info.json, every ImageSet is generated again if it differs or is missing"""
 
         Logger.info(f"Generating mod (mode={mode})...", prefix=cls._LOG_PREFIX)
-        cls._validate_data(mode, data)
-        angle = angle or 0
+        return cls.generate_mods([GeneratorJob(mode, data, output_dir, angle, base_mod)], file_version=file_version, use_remote_config=use_remote_config, icon_sizes=icon_sizes, custom_roblox_icon=custom_roblox_icon, additional_files=additional_files, stop_event=stop_event, workers=workers)
+
+
+    @classmethod
+    def generate_mods(cls, jobs: list[GeneratorJob], file_version: Optional[int] = None, use_remote_config: bool = True, icon_sizes: Literal[0, 1, 2, 3] = 0, custom_roblox_icon: Optional[Image.Image] = None, additional_files: Optional[list[AdditionalFile]] = None, stop_event: Optional[Event] = None, workers: int = 1) -> bool:
+        """Same as generate_mod for every job, but the version is resolved, downloaded and parsed once and every ImageSet is decoded once for all jobs. Returns False if it was cancelled"""
+
+        try:
+            with Profiler.span("generate_mods", category=cls._LOG_PREFIX, jobs=len(jobs)):
+                return cls._generate_mods(jobs, file_version, use_remote_config, icon_sizes, custom_roblox_icon, additional_files, stop_event, workers)
+        finally:
+            Profiler.flush()
+
+
+    @classmethod
+    def _generate_mods(cls, jobs: list[GeneratorJob], file_version: Optional[int], use_remote_config: bool, icon_sizes: Literal[0, 1, 2, 3], custom_roblox_icon: Optional[Image.Image], additional_files: Optional[list[AdditionalFile]], stop_event: Optional[Event], workers: int) -> bool:
+        if len(jobs) != 1:
+            Logger.info(f"Generating {len(jobs)} mods...", prefix=cls._LOG_PREFIX)
+        for job in jobs:
+            cls._validate_data(job.mode, job.data)
+
+        stage: Span = Profiler.span("Resolving version", category=cls._LOG_PREFIX)
 
         if file_version is None:
             deployment: RobloxVersion = LatestVersion("WindowsStudio64")
         else:
             deploy_history: DeployHistory = DeployHistory()
-            for item in reversed(deploy_history.studio_deployments):
-                if item.file_version.minor == file_version:
-                    deployment = item
-                    break
-            else: raise InvalidVersionError(file_version)
+            studio_deployment: RobloxVersion | None = deploy_history.get_latest(file_version)
+            if studio_deployment is None:
+                raise InvalidVersionError(file_version)
+            deployment = studio_deployment
         mod_info: dict[str, str | int] = {
             "clientVersionUpload": deployment.guid,
             "fileVersion": deployment.file_version.minor,
@@ -162,6 +423,7 @@ class ModGenerator:
             Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
             return False
 
+        stage = stage.next("Fetching remote config")
         if use_remote_config:
             response: Response = requests.get(Api.GitHub.MOD_GENERATOR_CONFIG)
             remote_config: RemoteConfig = RemoteConfig(response.json())
@@ -172,140 +434,189 @@ class ModGenerator:
             Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
             return False
 
-        output_dir = Path(output_dir).resolve()
-        if output_dir.exists():
-            raise FileExistsError(str(output_dir))
+        output_dirs: list[Path] = [Path(job.output_dir).resolve() for job in jobs]
+        if len(set(output_dirs)) != len(output_dirs):
+            raise ValueError("Every job must have a different output_dir")
+        for output_dir in output_dirs:
+            if output_dir.exists():
+                raise FileExistsError(str(output_dir))
 
-        Logger.info("Creating temporary directory...", prefix=cls._LOG_PREFIX)
-        with TemporaryDirectory() as tmp:
-            temporary_directory: Path = Path(tmp)
-            temp_target: Path = temporary_directory / "mod"
-            temp_target.mkdir(parents=True, exist_ok=True)
-            luapackages_target: Path = temporary_directory / "luapackages"
+        stage = stage.next("Downloading ImageSets")
+        Logger.info("Downloading ImageSets...", prefix=cls._LOG_PREFIX)
+        luapackages: Path = PackageCache.get(deployment.guid, "extracontent-luapackages.zip")
 
-            Logger.info("Writing info.json...", prefix=cls._LOG_PREFIX)
-            with open(temp_target / "info.json", "w") as file:
-                json.dump(mod_info, file, indent=4)
+        fingerprints: list[str] = [cls._get_fingerprint(job, icon_sizes, remote_config.blacklist, custom_roblox_icon) for job in jobs]
+        base_imagesets: list[dict[str, tuple[Path, tuple]]] = [
+            cls._get_base_imagesets(Path(job.base_mod).resolve(), fingerprint, icon_sizes, remote_config.blacklist, custom_roblox_icon) if job.base_mod is not None else {}
+            for job, fingerprint in zip(jobs, fingerprints)
+        ]
 
-            if stop_event is not None and stop_event.is_set():
-                Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
-                return False
-            
-            Logger.info("Downloading ImageSets...", prefix=cls._LOG_PREFIX)
-            filesystem.download(Api.Roblox.Deployment.download(deployment.guid, "extracontent-luapackages.zip"), temporary_directory / "luapackages.zip")
-            filesystem.extract(temporary_directory / "luapackages.zip", luapackages_target)
+        if stop_event is not None and stop_event.is_set():
+            Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
+            return False
 
-            if stop_event is not None and stop_event.is_set():
-                Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
-                return False
+        # Each mod is written to a hidden staging directory next to its output_dir and renamed once complete, so output_dir appears atomically
+        stage = stage.next("Creating staging directories")
+        Logger.info("Creating staging directories...", prefix=cls._LOG_PREFIX)
+        staging_targets: list[Path] = []
+        try:
+            for output_dir in output_dirs:
+                output_dir.parent.mkdir(parents=True, exist_ok=True)
+                staging_target: Path = output_dir.with_name(f".{output_dir.name}-{uuid.uuid4().hex[:8]}")
+                staging_target.mkdir()
+                staging_targets.append(staging_target)
 
-            Logger.info("Locating ImageSets...", prefix=cls._LOG_PREFIX)
-            imagesetdata_path: Path = locate_imagesetdata(luapackages_target)
-            imagesets_dir: Path = locate_imagesets(luapackages_target)
-            temp_target_imageset_path: Path = temp_target / "ExtraContent" / "Luapackages" / imagesets_dir.relative_to(luapackages_target)
-            shutil.copytree(imagesets_dir, temp_target_imageset_path, dirs_exist_ok=True)
+            Logger.info("Writing info.json...", prefix=cls._LOG_PREFIX)
+            for staging_target, fingerprint in zip(staging_targets, fingerprints):
+                with open(staging_target / "info.json", "w") as file:
+                    json.dump({**mod_info, cls._FINGERPRINT_KEY: fingerprint}, file, indent=4)
+
+            with ZipFile(luapackages, "r") as archive:
+                Logger.info("Locating ImageSets...", prefix=cls._LOG_PREFIX)
+                zip_infos: dict[str, ZipInfo] = {info.filename: info for info in archive.infolist()}
+                member_names: list[str] = list(zip_infos)
+                imagesetdata_member: str = locate_imagesetdata_member(member_names)
+                imagesets_member_dir: str = locate_imagesets_member(member_names)
+                imageset_subpath: Path = Path("ExtraContent", "Luapackages", PurePosixPath(imagesets_member_dir))  # Relative to each staging directory
+                for staging_target in staging_targets:
+                    (staging_target / imageset_subpath).mkdir(parents=True, exist_ok=True)
+
+                stage = stage.next(f"Parsing {IMAGESETDATA_NAME}")
+                Logger.info(f"Parsing {IMAGESETDATA_NAME}...", prefix=cls._LOG_PREFIX)
+                image_set_data: ImageSetData = ImageSetData.from_content(archive.read(imagesetdata_member).decode(), imageset_subpath, icon_sizes=icon_sizes, version_guid=deployment.guid)
 
-            if stop_event is not None and stop_event.is_set():
-                Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
-                return False
+                if stop_event is not None and stop_event.is_set():
+                    Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
+                    return False
 
-            Logger.info("Preparing ImageSets...", prefix=cls._LOG_PREFIX)
-            if icon_sizes != 0:
-                for path in temp_target_imageset_path.iterdir():
-                    if path.suffix != ".png":
+                # Everything in the ImageSet directory is copied, like ModUpdater does. Only ImageSets of other sizes are left out if icon_sizes is set
+                stage = stage.next("Preparing ImageSets")
+                Logger.info("Preparing ImageSets...", prefix=cls._LOG_PREFIX)
+                generated_names: set[str] = {imageset.path.name for imageset in image_set_data.imagesets}
+                for member in member_names:
+                    if not member.startswith(imagesets_member_dir) or member.endswith("/"):
                         continue
-                    if not path.name.startswith(f"img_set_{icon_sizes}x"):
-                        path.unlink()
-
-            if stop_event is not None and stop_event.is_set():
-                Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
-                return False
-
-            Logger.info(f"Parsing {imagesetdata_path.name}...", prefix=cls._LOG_PREFIX)
-            image_set_data: ImageSetData = ImageSetData(imagesetdata_path, temp_target_imageset_path, icon_sizes=icon_sizes)
+                    name: str = member.removeprefix(imagesets_member_dir)
+                    if name in generated_names:
+                        continue
+                    if "/" not in name and name.endswith(".png") and icon_sizes != 0 and not name.startswith(f"img_set_{icon_sizes}x"):
+                        continue
+                    content: bytes = archive.read(member)
+                    for staging_target in staging_targets:
+                        target: Path = staging_target / imageset_subpath / PurePosixPath(name)
+                        target.parent.mkdir(parents=True, exist_ok=True)
+                        target.write_bytes(content)
 
             if stop_event is not None and stop_event.is_set():
                 Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
                 return False
 
-            Logger.info("Generating ImageSets...", prefix=cls._LOG_PREFIX)
-            ROBLOX_LOGO_NAME: str = "icons/logo/block"
-            for imageset in image_set_data.imagesets:
-                with Image.open(imageset.path, formats=("PNG",)) as imageset_image_object:
-                    if imageset_image_object.mode != "RGBA":
-                        imageset_image_object = imageset_image_object.convert("RGBA")
-
-                    for icon in imageset.icons:
-                        if cls._is_icon_blacklisted(icon.name, remote_config.blacklist):
+            with MaskStorage.scope():
+                stage = stage.next("Generating ImageSets", imagesets=len(image_set_data.imagesets), workers=workers)
+                Logger.info("Generating ImageSets...", prefix=cls._LOG_PREFIX)
+                imageset_jobs: list[tuple[str, list[tuple[Path, Literal["color", "gradient", "custom"], tuple[int, int, int] | list[GradientColor] | Image.Image, float]], list[ImageSetIcon], list[ImageSetIcon]]] = []
+                reused_count: int = 0
+                for imageset in image_set_data.imagesets:
+                    member = f"{imagesets_member_dir}{imageset.path.name}"
+                    masked_icons, roblox_logo_icons = cls._split_icons(imageset, remote_config.blacklist, custom_roblox_icon)
+                    signature: tuple | None = cls._get_imageset_signature(zip_infos[member], masked_icons, roblox_logo_icons) if member in zip_infos else None
+
+                    outputs: list[tuple[Path, Literal["color", "gradient", "custom"], tuple[int, int, int] | list[GradientColor] | Image.Image, float]] = []
+                    for job, staging_target, base in zip(jobs, staging_targets, base_imagesets):
+                        target = staging_target / imageset.path
+                        base_imageset: tuple[Path, tuple] | None = base.get(imageset.path.name)
+                        if base_imageset is not None and base_imageset[1] == signature:
+                            cls._link_or_copy(base_imageset[0], target)
+                            reused_count += 1
                             continue
+                        outputs.append((target, job.mode, job.data, job.angle or 0))
 
-                        if custom_roblox_icon is not None and icon.name == ROBLOX_LOGO_NAME:
-                            imageset_image_object.paste(custom_roblox_icon.resize((icon.w, icon.h), resample=Image.Resampling.LANCZOS), (icon.x, icon.y))
-                        else:
-                            cropped: Image.Image = imageset_image_object.crop((icon.x, icon.y, icon.x + icon.w, icon.y + icon.h))
-                            cls.apply_mask(cropped, mode=mode, data=data, angle=angle)
-                            imageset_image_object.paste(cropped, (icon.x, icon.y))
-                    imageset_image_object.save(imageset.path, format="PNG", pnginfo=metadata)
+                    if outputs:
+                        imageset_jobs.append((member, outputs, masked_icons, roblox_logo_icons))
 
-                if stop_event is not None and stop_event.is_set():
-                    Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
-                    return False
+                if any(job.base_mod is not None for job in jobs):
+                    Logger.info(f"Reused {reused_count}/{len(image_set_data.imagesets) * len(jobs)} ImageSets from base mods", prefix=cls._LOG_PREFIX)
 
-            if additional_files:
-                Logger.info("Generating additional files...", prefix=cls._LOG_PREFIX)
-                additional_file_counter: int = 0
-                for additional_file in additional_files:
-                    additional_file_counter += 1
+                workers = min(workers, os.cpu_count() or 1, len(imageset_jobs))
+                if workers <= 1:
+                    for member, outputs, masked_icons, roblox_logo_icons in imageset_jobs:
+                        cls._generate_imageset(luapackages, member, outputs, masked_icons, roblox_logo_icons, custom_roblox_icon, metadata)
 
-                    if additional_file_counter % 20 == 0:
                         if stop_event is not None and stop_event.is_set():
                             Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
                             return False
 
-
-                    target: Path = Path(temp_target, *re.split(r"[\\/]", additional_file.target))
-
-                    if target.suffix != ".png":
-                        Logger.warning(f"Skipping file '{target.name}'... (Invalid filetype, must be '.png')")
-                        continue
-
-                    match = re.search(r'@(\d+)x$', target.stem)
-                    if match:
-                        icon_size = int(match.group(1))
-                        if icon_size != icon_sizes:
-                            Logger.warning(f"Skipping file '{target.name}'... (Only generating @{icon_sizes}x sizes)")
+                else:
+                    Logger.info(f"Using {workers} workers...", prefix=cls._LOG_PREFIX)
+                    with ProcessPoolExecutor(max_workers=workers) as executor:
+                        pending: set[Future] = {
+                            executor.submit(cls._generate_imageset_in_worker, luapackages, member, outputs, masked_icons, roblox_logo_icons, custom_roblox_icon, metadata)
+                            for member, outputs, masked_icons, roblox_logo_icons in imageset_jobs
+                        }
+                        while pending:
+                            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                Profiler.extend(future.result())
+
+                            if stop_event is not None and stop_event.is_set():
+                                executor.shutdown(wait=True, cancel_futures=True)
+                                Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
+                                return False
+
+                if additional_files:
+                    stage = stage.next("Generating additional files", files=len(additional_files))
+                    Logger.info("Generating additional files...", prefix=cls._LOG_PREFIX)
+                    additional_file_counter: int = 0
+                    for additional_file in additional_files:
+                        additional_file_counter += 1
+
+                        if additional_file_counter % 20 == 0:
+                            if stop_event is not None and stop_event.is_set():
+                                Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
+                                return False
+
+
+                        relative_target: Path = Path(*re.split(r"[\\/]", additional_file.target))
+
+                        if relative_target.suffix != ".png":
+                            Logger.warning(f"Skipping file '{relative_target.name}'... (Invalid filetype, must be '.png')")
                             continue
 
-                    image_copy: Image.Image = additional_file.image.copy()
-                    if image_copy.mode != "RGBA":
-                        image_copy = image_copy.convert("RGBA")
-                    cls.apply_mask(image_copy, mode, data, angle)
-                    target.parent.mkdir(parents=True, exist_ok=True)
-                    image_copy.save(target, format="PNG", pnginfo=metadata)
+                        match = re.search(r'@(\d+)x$', relative_target.stem)
+                        if match:
+                            icon_size = int(match.group(1))
+                            if icon_size != icon_sizes:
+                                Logger.warning(f"Skipping file '{relative_target.name}'... (Only generating @{icon_sizes}x sizes)")
+                                continue
+
+                        source_image: Image.Image = additional_file.image if additional_file.image.mode == "RGBA" else additional_file.image.convert("RGBA")
+                        for job, staging_target in zip(jobs, staging_targets):
+                            image_copy: Image.Image = source_image.copy()
+                            cls.apply_mask(image_copy, job.mode, job.data, job.angle or 0)
+                            target = staging_target / relative_target
+                            target.parent.mkdir(parents=True, exist_ok=True)
+                            image_copy.save(target, format="PNG", pnginfo=metadata)
 
             if stop_event is not None and stop_event.is_set():
                 Logger.info("Mod generator cancelled!", prefix=cls._LOG_PREFIX)
                 return False
 
-            if output_dir.exists():
-                raise FileExistsError(str(output_dir))
-            shutil.copytree(temp_target, output_dir, dirs_exist_ok=True)
-            Logger.info("Mod generated successfully!", prefix=cls._LOG_PREFIX)
+            stage = stage.next("Finishing")
+            for output_dir in output_dirs:
+                if output_dir.exists():
+                    raise FileExistsError(str(output_dir))
+            for staging_target, output_dir in zip(staging_targets, output_dirs):
+                staging_target.rename(output_dir)
+            Logger.info("Mod generated successfully!" if len(jobs) == 1 else f"{len(jobs)} mods generated successfully!", prefix=cls._LOG_PREFIX)
             return True
 
+        finally:
+            stage.end()
+            for staging_target in staging_targets:
+                if staging_target.exists():
+                    shutil.rmtree(staging_target, ignore_errors=True)
+
 
     @classmethod
     def _is_icon_blacklisted(cls, name: str, blacklist: IconBlacklist) -> bool:
-        for prefix in blacklist.prefixes:
-            if name.startswith(prefix):
-                return True
-        for suffix in blacklist.suffixes:
-            if name.endswith(suffix):
-                return True
-        for keyword in blacklist.keywords:
-            if keyword in name:
-                return True
-        for strict in blacklist.strict:
-            if name == strict:
-                return True
-        return False
\ No newline at end of file
+        return blacklist.is_blacklisted(name)
\ No newline at end of file
@@ -1,5 +1,7 @@
-from typing import NamedTuple
-from dataclasses import dataclass
+from typing import NamedTuple, Literal, Optional
+from pathlib import Path
+from dataclasses import dataclass, field
+import re
 
 from PIL import Image  # type: ignore
 
@@ -16,12 +18,54 @@ class AdditionalFile:
     target: str
 
 
+@dataclass
+class GeneratorJob:
+    mode: Literal["color", "gradient", "custom"]
+    data: tuple[int, int, int] | list[GradientColor] | Image.Image
+    output_dir: str | Path
+    angle: Optional[float] = None
+    base_mod: Optional[str | Path] = None
+
+
 @dataclass
 class IconBlacklist:
+    """Compiled on creation, call compile() again after modifying the lists"""
     prefixes: list[str]
     suffixes: list[str]
     keywords: list[str]
     strict: list[str]
+    _strict: frozenset[str] = field(init=False, repr=False, compare=False)
+    _prefixes: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _suffixes: tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _keywords: Optional[re.Pattern] = field(init=False, repr=False, compare=False)
+    _results: dict[str, bool] = field(init=False, repr=False, compare=False)
+
+
+    def __post_init__(self) -> None:
+        self.compile()
+
+
+    def compile(self) -> None:
+        self._strict = frozenset(self.strict)
+        self._prefixes = tuple(sorted(set(self.prefixes)))
+        self._suffixes = tuple(sorted(set(self.suffixes)))
+        # Longest keywords first, so the alternation behaves like a single keyword automaton
+        keywords: list[str] = sorted(set(self.keywords), key=len, reverse=True)
+        self._keywords = re.compile("|".join(re.escape(keyword) for keyword in keywords)) if keywords else None
+        self._results = {}
+
+
+    def is_blacklisted(self, name: str) -> bool:
+        result: bool | None = self._results.get(name)
+        if result is None:
+            result = (
+                name in self._strict
+                or name.startswith(self._prefixes)
+                or name.endswith(self._suffixes)
+                or (self._keywords is not None and self._keywords.search(name) is not None)
+            )
+            self._results[name] = result
+        return result
 
 
 class RemoteConfig:
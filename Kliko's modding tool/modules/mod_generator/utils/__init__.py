@@ -1,2 +1,2 @@
 from .mask_storage import MaskStorage
-from .imagesets import ImageSetData, ImageSet, ImageSetIcon, locate_imagesets, locate_imagesetdata
\ No newline at end of file
+from .imagesets import ImageSetData, ImageSet, ImageSetIcon
\ No newline at end of file
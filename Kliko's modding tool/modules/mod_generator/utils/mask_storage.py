@@ -1,4 +1,16 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Hashable, Iterator
+import weakref
+import hashlib
+import shutil
 import math
+import os
+
+from modules.logger import Logger
+from modules.filesystem import Directories, atomic_write
 
 from ..dataclasses import GradientColor
 
@@ -6,26 +18,103 @@ from PIL import Image  # type: ignore
 import numpy as np  # type: ignore
 
 
+CUSTOM_MASK_CACHE_LIMIT: int = 8  # Number of custom mask images kept on disk
+GRADIENT_LUT_SIZE: int = 16384  # Minimum number of colour samples per gradient
+GRADIENT_LUT_MAX_SIZE: int = 1048576  # Limit for gradients with very close stops, larger tables exceed the precision of float32 positions
+GRADIENT_LUT_CACHE_LIMIT: int = 64
+
+
 class MaskStorage:
-    cache: dict[str, Image.Image] = {}
+    """LRU cache for generated masks, limited to max_bytes of pixel data"""
+
+    _LOG_PREFIX: str = "MaskStorage"
+    max_bytes: int = 256 * 1024 * 1024
+    cache: OrderedDict[Hashable, Image.Image] = OrderedDict()
+    size_bytes: int = 0
+    hits: int = 0
+    misses: int = 0
+    _scope_depth: int = 0
+    _lock: Lock = Lock()
+    _digests: dict[int, tuple[weakref.ref, str]] = {}
+    _gradient_luts: dict[tuple, np.ndarray] = {}
+
+
+    @classmethod
+    @contextmanager
+    def scope(cls) -> Iterator[None]:
+        """Masks are kept until the outermost scope exits, e.g. for the duration of a generation run"""
+
+        with cls._lock:
+            if cls._scope_depth == 0:
+                cls.hits = 0
+                cls.misses = 0
+            cls._scope_depth += 1
+        try:
+            yield
+        finally:
+            with cls._lock:
+                cls._scope_depth -= 1
+                if cls._scope_depth == 0:
+                    Logger.debug(f"hits={cls.hits}, misses={cls.misses}, size={cls.size_bytes / 1024 / 1024:.2f}MB", prefix=cls._LOG_PREFIX)
+                    cls.cache.clear()
+                    cls.size_bytes = 0
+
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls.cache.clear()
+            cls.size_bytes = 0
+
+
+    @classmethod
+    def _get(cls, key: Hashable) -> Image.Image | None:
+        with cls._lock:
+            mask: Image.Image | None = cls.cache.get(key)
+            if mask is None:
+                cls.misses += 1
+                return None
+            cls.cache.move_to_end(key)
+            cls.hits += 1
+            return mask
+
+
+    @classmethod
+    def _set(cls, key: Hashable, mask: Image.Image) -> None:
+        width, height = mask.size
+        size_bytes: int = width * height * len(mask.getbands())
+        if size_bytes > cls.max_bytes:
+            return
+
+        with cls._lock:
+            previous: Image.Image | None = cls.cache.pop(key, None)
+            if previous is not None:
+                cls.size_bytes -= previous.size[0] * previous.size[1] * len(previous.getbands())
+            cls.cache[key] = mask
+            cls.size_bytes += size_bytes
+
+            while cls.size_bytes > cls.max_bytes:
+                _, evicted = cls.cache.popitem(last=False)
+                cls.size_bytes -= evicted.size[0] * evicted.size[1] * len(evicted.getbands())
+
 
     @classmethod
     def get_solid_color(cls, color: tuple[int, int, int], size: tuple[int, int], dont_cache: bool = False) -> Image.Image:
-        cache_key: str = f"{color}-{size}"
-        cached_mask: Image.Image | None = cls.cache.get(cache_key)
+        cache_key: tuple = ("color", tuple(color), tuple(size))
+        cached_mask: Image.Image | None = cls._get(cache_key)
         if cached_mask is not None:
             return cached_mask
         
         mask: Image.Image = Image.new("RGBA", size, color)
         if not dont_cache:
-            cls.cache[cache_key] = mask
+            cls._set(cache_key, mask)
         return mask
 
 
     @classmethod  # AI-generated
     def get_gradient(cls, colors: list[GradientColor], angle_degrees: float, size: tuple[int, int], dont_cache: bool = False) -> Image.Image:
-        cache_key: str = f"{colors}-{angle_degrees}-{size}"
-        cached_mask: Image.Image | None = cls.cache.get(cache_key)
+        cache_key: tuple = ("gradient", tuple((item.stop, tuple(item.color)) for item in colors), angle_degrees, tuple(size))
+        cached_mask: Image.Image | None = cls._get(cache_key)
         if cached_mask is not None:
             return cached_mask
 
@@ -35,46 +124,80 @@ class MaskStorage:
         dx: float = math.cos(angle)
         dy: float = math.sin(angle)
 
-        x = np.linspace(0, 1, width)
-        y = np.linspace(0, 1, height)
-        xv, yv = np.meshgrid(x, y)
-        pos = (xv * dx + yv * dy)
-        pos = (pos - pos.min()) / (pos.max() - pos.min())
+        # Broadcasting two 1-D axes avoids allocating a full float64 meshgrid
+        x = np.linspace(0, 1, width, dtype=np.float32) * np.float32(dx)
+        y = np.linspace(0, 1, height, dtype=np.float32) * np.float32(dy)
+        pos = y[:, None] + x[None, :]
+        pos_min = pos.min()
+        pos_range = pos.max() - pos_min
+        if pos_range == 0:
+            img = np.zeros((height, width, 3), dtype=np.uint8)
+        else:
+            lut: np.ndarray = cls._get_gradient_lut(cache_key[1])
+            scale: int = len(lut) - 1
+            first_stop: float = min(stop for stop, _ in cache_key[1])
+            last_stop: float = max(stop for stop, _ in cache_key[1])
+            pos -= pos_min
+            pos *= scale / pos_range
+            # Positions outside of the stops are black. Masked here rather than in the table, where rounding to the nearest sample would move the edges
+            outside = (pos < first_stop * scale) | (pos > last_stop * scale) if first_stop > 0 or last_stop < 1 else None
+            pos += 0.5
+            img = np.take(lut, pos.astype(np.int32), axis=0)
+            if outside is not None:
+                img[outside] = 0
+
+        result: Image.Image = Image.fromarray(img)
+        if not dont_cache:
+            cls._set(cache_key, result)
+        return result
 
-        img = np.zeros((height, width, 3), dtype=np.uint8)
-        sorted_colors: list[GradientColor] = sorted(colors, key=lambda item: item.stop)
 
-        for i in range(len(sorted_colors) - 1):
-            color_item0 = sorted_colors[i]
-            p0 = color_item0.stop
-            c0 = color_item0.color
+    @classmethod
+    def _get_gradient_lut(cls, stops: tuple[tuple[float, tuple[int, int, int]], ...]) -> np.ndarray:
+        """1-D colour lookup table sampled over [0, 1], positions outside the stops take the colour of the nearest stop"""
 
-            color_item1 = sorted_colors[i+1]
-            p1 = color_item1.stop
-            c1 = color_item1.color
+        lut: np.ndarray | None = cls._gradient_luts.get(stops)
+        if lut is not None:
+            return lut
 
-            if p0 == p1:
-                continue
+        sorted_stops = sorted(stops, key=lambda item: item[0])
+        xp = np.array([stop for stop, _ in sorted_stops], dtype=np.float64)
+        fp = np.array([color for _, color in sorted_stops], dtype=np.float64).reshape(-1, 3)
 
-            mask = (pos >= p0) & (pos <= p1)
-            t = (pos[mask] - p0) / (p1 - p0)
+        # Positions are rounded to the nearest sample, so a segment must not change by more than one colour value per sample
+        size: int = GRADIENT_LUT_SIZE
+        for (p0, c0), (p1, c1) in zip(sorted_stops, sorted_stops[1:]):
+            if p1 > p0:
+                size = max(size, math.ceil(max(abs(a - b) for a, b in zip(c0, c1)) / (p1 - p0)) + 1)
+        size = min(size, GRADIENT_LUT_MAX_SIZE)
+        samples = np.linspace(0, 1, size)
 
+        lut = np.zeros((size, 3), dtype=np.uint8)
+        if len(sorted_stops) > 1:
             for ch in range(3):
-                img[..., ch][mask] = (np.array(c0[ch]) * (1 - t) + np.array(c1[ch]) * t).astype(np.uint8)
+                lut[:, ch] = np.interp(samples, xp, fp[:, ch]).astype(np.uint8)
 
-        result: Image.Image = Image.fromarray(img)
-        if not dont_cache:
-            cls.cache[cache_key] = result
-        return result
+        if len(cls._gradient_luts) >= GRADIENT_LUT_CACHE_LIMIT:
+            cls._gradient_luts.clear()
+        cls._gradient_luts[stops] = lut
+        return lut
 
 
     @classmethod
     def get_custom(cls, image: Image.Image, size: tuple[int, int], dont_cache: bool = False) -> Image.Image:
-        cache_key: str = f"{image}-{size}"
-        cached_mask: Image.Image | None = cls.cache.get(cache_key)
+        digest: str = cls._get_digest(image)
+        cache_key: tuple = ("custom", digest, tuple(size))
+        cached_mask: Image.Image | None = cls._get(cache_key)
         if cached_mask is not None:
             return cached_mask
 
+        cache_file: Path = Directories.MASK_CACHE / digest / f"{size[0]}x{size[1]}.png"
+        cached_mask = cls._read_cache_file(cache_file)
+        if cached_mask is not None:
+            if not dont_cache:
+                cls._set(cache_key, cached_mask)
+            return cached_mask
+
         if image.mode != "RGBA":
             image = image.convert("RGBA")
 
@@ -92,10 +215,60 @@ class MaskStorage:
         resized: Image.Image = cropped.resize(size, resample=Image.Resampling.LANCZOS)
 
         if not dont_cache:
-            cls.cache[cache_key] = resized
+            cls._set(cache_key, resized)
+            cls._write_cache_file(cache_file, resized)
         return resized
 
 
+    @classmethod
+    def _get_digest(cls, image: Image.Image) -> str:
+        """Content digest of the source pixels, memoized per image object"""
+
+        with cls._lock:
+            entry: tuple[weakref.ref, str] | None = cls._digests.get(id(image))
+            if entry is not None and entry[0]() is image:
+                return entry[1]
+
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{image.mode}-{image.size[0]}x{image.size[1]}".encode())
+        hasher.update(image.tobytes())
+        digest: str = hasher.hexdigest()
+
+        with cls._lock:
+            key: int = id(image)
+            cls._digests[key] = (weakref.ref(image, lambda _: cls._digests.pop(key, None)), digest)
+        return digest
+
+
+    @staticmethod
+    def _read_cache_file(path: Path) -> Image.Image | None:
+        if not path.is_file():
+            return None
+
+        try:
+            with Image.open(path, formats=["PNG"]) as image:
+                image.load()
+                os.utime(path.parent)
+                return image if image.mode == "RGBA" else image.convert("RGBA")
+        except (OSError, ValueError):
+            return None
+
+
+    @staticmethod
+    def _write_cache_file(path: Path, mask: Image.Image) -> None:
+        # Also runs inside mod generator worker processes, so failures are silently ignored instead of logged
+        try:
+            with atomic_write(path) as temp:
+                mask.save(temp, format="PNG")
+
+            cached_dirs: list[Path] = sorted((item for item in path.parent.parent.iterdir() if item.is_dir()), key=lambda item: item.stat().st_mtime, reverse=True)
+            for old_dir in cached_dirs[CUSTOM_MASK_CACHE_LIMIT:]:
+                shutil.rmtree(old_dir, ignore_errors=True)
+
+        except OSError:
+            pass
+
+
     @classmethod
     def _crop_to_fit(cls, image: Image.Image, target_ratio: float) -> Image.Image:
         w, h = image.size
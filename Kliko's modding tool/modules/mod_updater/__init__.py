@@ -1,16 +1,22 @@
-from typing import Literal, Optional
+from typing import Literal, Optional, Callable
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from threading import Lock
+from zipfile import ZipFile
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 import shutil
 import json
 import numpy as np
 
 from modules.logger import Logger
+from modules.profiler import Profiler, Span
 from modules import filesystem
-from modules.deployments import RobloxVersion, LatestVersion, DeployHistory
+from modules.deployments import RobloxVersion, LatestVersion, DeployHistory, PackageCache
 from modules.networking import requests, Response, Api
+from modules.imagesets import locate_imagesets, locate_imagesetdata, locate_imagesets_member, locate_imagesetdata_member
 
-from .imagesets import locate_imagesets, locate_imagesetdata, ImageSetData, ImageSet, ImageSetIcon
+from .imagesets import ImageSetData, ImageSet, ImageSetIcon
+from .dataclasses import Luapackages, UpdateResult
 from .exceptions import *
 
 from PIL import Image  # type: ignore
@@ -18,9 +24,41 @@ from PIL import Image  # type: ignore
 
 class ModUpdater:
     _LOG_PREFIX: str = "ModUpdater"
+    _DOWNLOAD_WORKERS: int = 4
 
 
 # region check
+    @staticmethod
+    def _resolve_versions(mod_info: dict[str, str | int], latest_version: RobloxVersion, deploy_history: DeployHistory) -> tuple[RobloxVersion, RobloxVersion]:
+        """Returns the Studio deployments of the mod and of the latest version"""
+
+        mod_file_version: int | None = mod_info.get("fileVersion")  # type: ignore
+        if isinstance(mod_file_version, int):
+            mod_version: RobloxVersion | None = deploy_history.get_latest(mod_file_version)
+            if mod_version is None:
+                raise InvalidVersionError(mod_file_version)
+
+        else:
+            mod_guid: str | None = mod_info.get("clientVersionUpload")  # type: ignore
+            if not isinstance(mod_guid, str):
+                raise ValueError("Unknown mod verison!")
+            mod_version = deploy_history.get_by_guid(mod_guid)
+            if mod_version is not None and mod_version.binary_type != "WindowsStudio64":
+                mod_version = deploy_history.get_latest(mod_version.file_version.minor)
+            if mod_version is None:
+                raise ValueError(f"Invalid clientVersionUpload: {mod_guid}")
+
+        latest_file_version: int = latest_version.file_version.minor
+        if latest_version.binary_type == "WindowsStudio64":
+            target_version: RobloxVersion | None = latest_version
+        else:
+            target_version = deploy_history.get_latest(latest_file_version)
+            if target_version is None:
+                raise InvalidVersionError(latest_file_version)
+
+        return mod_version, target_version
+
+
     @classmethod
     def check_for_updates(cls, mod: Path, latest_version: RobloxVersion) -> bool:
         Logger.info(f"Checking for updates: '{mod.name}'...", prefix=cls._LOG_PREFIX)
@@ -30,47 +68,8 @@ class ModUpdater:
         with open(mod / "info.json", "r") as file:
             mod_info: dict[str, str | int] = json.load(file)
 
-        # 💀
         deploy_history: DeployHistory = DeployHistory()
-        mod_file_version: int | None = mod_info.get("fileVersion")  # type: ignore
-        if not isinstance(mod_file_version, int):
-            mod_guid: str | None = mod_info.get("clientVersionUpload")  # type: ignore
-            if not isinstance(mod_guid, str):
-                raise ValueError("Unknown mod verison!")
-            else:
-                for item in reversed(deploy_history.studio_deployments):
-                    if item.guid == mod_guid:
-                        mod_version: RobloxVersion = item
-                        break
-                else:
-                    for item in reversed(deploy_history.player_deployments):
-                        if item.guid == mod_guid:
-                            mod_file_version = item.file_version.minor
-                            break
-                    else:
-                        raise ValueError(f"Invalid clientVersionUpload: {mod_guid}")
-                    for item in reversed(deploy_history.studio_deployments):
-                        if item.file_version.minor == mod_file_version:
-                            mod_version = item
-                            break
-                    else:
-                        raise ValueError(f"Invalid clientVersionUpload: {mod_guid}")
-        else:
-            for item in reversed(deploy_history.studio_deployments):
-                if item.file_version.minor == mod_file_version:
-                    mod_version = item
-                    break
-            else: raise InvalidVersionError(mod_file_version)
-
-        latest_file_version: int = latest_version.file_version.minor
-        if latest_version.binary_type == "WindowsStudio64":
-            target_version: RobloxVersion = latest_version
-        else:
-            for item in reversed(deploy_history.studio_deployments):
-                if item.file_version.minor == latest_file_version:
-                    target_version = item
-                    break
-            else: raise InvalidVersionError(latest_file_version)
+        mod_version, target_version = cls._resolve_versions(mod_info, latest_version, deploy_history)
 
         return mod_version.file_version != target_version.file_version
 # endregion
@@ -79,7 +78,17 @@ class ModUpdater:
 # region update
     @classmethod
     def update_mod(cls, mod: Path, latest_version: RobloxVersion) -> None:
+        try:
+            with Profiler.span("update_mod", category=cls._LOG_PREFIX, mod=mod.name):
+                cls._update_mod(mod, latest_version)
+        finally:
+            Profiler.flush()
+
+
+    @classmethod
+    def _update_mod(cls, mod: Path, latest_version: RobloxVersion) -> None:
         Logger.info(f"Updating mod: '{mod.name}'...", prefix=cls._LOG_PREFIX)
+        stage: Span = Profiler.span("Resolving versions", category=cls._LOG_PREFIX)
 
         if not (mod / "info.json").exists():
             raise FileNotFoundError(str(mod / "info.json"))
@@ -87,108 +96,204 @@ class ModUpdater:
             mod_info: dict[str, str | int] = json.load(file)
 
         deploy_history: DeployHistory = DeployHistory()
-        mod_file_version: int | None = mod_info.get("fileVersion")  # type: ignore
-        if not isinstance(mod_file_version, int):
-            mod_guid: str | None = mod_info.get("clientVersionUpload")  # type: ignore
-            if not isinstance(mod_guid, str):
-                raise ValueError("Unknown mod verison!")
-            else:
-                for item in reversed(deploy_history.studio_deployments):
-                    if item.guid == mod_guid:
-                        mod_version: RobloxVersion = item
-                        break
-                else:
-                    for item in reversed(deploy_history.player_deployments):
-                        if item.guid == mod_guid:
-                            mod_file_version = item.file_version.minor
-                            break
-                    else:
-                        raise ValueError(f"Invalid clientVersionUpload: {mod_guid}")
-                    for item in reversed(deploy_history.studio_deployments):
-                        if item.file_version.minor == mod_file_version:
-                            mod_version = item
-                            break
-                    else:
-                        raise ValueError(f"Invalid clientVersionUpload: {mod_guid}")
-        else:
-            for item in reversed(deploy_history.studio_deployments):
-                if item.file_version.minor == mod_file_version:
-                    mod_version = item
-                    break
-            else: raise InvalidVersionError(mod_file_version)
-
-        latest_file_version: int = latest_version.file_version.minor
-        if latest_version.binary_type == "WindowsStudio64":
-            target_version: RobloxVersion = latest_version
-        else:
-            for item in reversed(deploy_history.studio_deployments):
-                if item.file_version.minor == latest_file_version:
-                    target_version = item
-                    break
-            else: raise InvalidVersionError(latest_file_version)
+        mod_version, target_version = cls._resolve_versions(mod_info, latest_version, deploy_history)
 
         if mod_version.file_version == target_version.file_version:
+            stage.end()
             Logger.info("Mod is not outdated. Cancelling update...", prefix=cls._LOG_PREFIX)
             return
 
-        mod_info.update({
-            "clientVersionUpload": target_version.guid,
-            "fileVersion": target_version.file_version.minor
-        })
-
 
         Logger.info("Creating temporary directory...", prefix=cls._LOG_PREFIX)
         with TemporaryDirectory() as tmp:
             temporary_directory: Path = Path(tmp)
-            temp_target: Path = temporary_directory / "mod"
-            temp_target.mkdir(parents=True, exist_ok=True)
-            old_luapackages_path: Path = temporary_directory / "luapackages_old"
-            new_luapackages_path: Path = temporary_directory / "luapackages_new"
 
+            stage = stage.next("Downloading ImageSets")
+            Logger.info("Downloading ImageSets...", prefix=cls._LOG_PREFIX)
+            luapackages: dict[str, Luapackages] = cls._get_luapackages([mod_version.guid, target_version.guid], temporary_directory / "luapackages")
+            stage.end()
 
-            Logger.info("Copying mod...", prefix=cls._LOG_PREFIX)
-            shutil.copytree(mod, temp_target, dirs_exist_ok=True)
+            cls._apply_update(mod, mod_info, target_version, luapackages[mod_version.guid], luapackages[target_version.guid], temporary_directory / "update")
 
+        Logger.info("Mod updated successfully!", prefix=cls._LOG_PREFIX)
 
-            Logger.info("Writing info.json...", prefix=cls._LOG_PREFIX)
-            with open(temp_target / "info.json", "w") as file:
-                json.dump(mod_info, file, indent=4)
 
+    @staticmethod
+    def find_mods(directory: Path) -> list[Path]:
+        """Returns the directory itself if it is a mod, otherwise every subdirectory that contains an info.json"""
 
-            Logger.info("Downloading ImageSets...", prefix=cls._LOG_PREFIX)
-            filesystem.download(Api.Roblox.Deployment.download(mod_version.guid, "extracontent-luapackages.zip"), temporary_directory / "luapackages.zip")
-            filesystem.extract(temporary_directory / "luapackages.zip", old_luapackages_path)
+        if (directory / "info.json").is_file():
+            return [directory]
+        if not directory.is_dir():
+            return []
+        return sorted(path for path in directory.iterdir() if (path / "info.json").is_file())
+
+
+    @classmethod
+    def update_mods(cls, mods: list[Path], latest_version: RobloxVersion, output_dir: Optional[Path] = None, workers: int = 1) -> list[UpdateResult]:
+        """Updates multiple mods with a single DeployHistory, downloading the luapackages of every distinct version only once. If output_dir is given, outdated mods are copied into it and the copies are updated. Returns one result per mod, in order"""
+
+        try:
+            with Profiler.span("update_mods", category=cls._LOG_PREFIX, mods=len(mods), workers=workers):
+                return cls._update_mods(mods, latest_version, output_dir, workers)
+        finally:
+            Profiler.flush()
+
+
+    @classmethod
+    def _update_mods(cls, mods: list[Path], latest_version: RobloxVersion, output_dir: Optional[Path], workers: int) -> list[UpdateResult]:
+        Logger.info(f"Updating {len(mods)} mods...", prefix=cls._LOG_PREFIX)
+        stage: Span = Profiler.span("Resolving versions", category=cls._LOG_PREFIX)
+
+        results: dict[Path, UpdateResult] = {}
+        groups: dict[str, list[tuple[Path, dict[str, str | int], Path]]] = {}  # mod version guid -> [(mod, mod_info, output_path)]
+        output_paths: dict[Path, Path] = {}  # output path -> mod
+        target_version: Optional[RobloxVersion] = None
+        deploy_history: DeployHistory = DeployHistory()
+        for mod in dict.fromkeys(mods):
+            if not (mod / "info.json").exists():  # Mod not compatible
+                results[mod] = UpdateResult(mod, "incompatible")
+                continue
+            try:
+                with open(mod / "info.json", "r") as file:
+                    mod_info: dict[str, str | int] = json.load(file)
+                mod_version, target_version = cls._resolve_versions(mod_info, latest_version, deploy_history)
+            except Exception as e:
+                Logger.error(f"Failed to resolve the version of '{mod.name}': {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+                results[mod] = UpdateResult(mod, "failed", exception=e)
+                continue
 
-            filesystem.download(Api.Roblox.Deployment.download(target_version.guid, "extracontent-luapackages.zip"), temporary_directory / "luapackages.zip")
-            filesystem.extract(temporary_directory / "luapackages.zip", new_luapackages_path)
+            if mod_version.file_version == target_version.file_version:
+                results[mod] = UpdateResult(mod, "up_to_date", output=mod)
+                continue
+
+            # Checked before anything is updated, so that no mod is overwritten by another one or by its own copy
+            try:
+                output_path: Path = cls._get_output_path(mod, output_dir)
+                if output_path in output_paths:
+                    raise OutputConflictError(mod, output_path, f"'{output_paths[output_path]}' has the same name")
+            except OutputConflictError as e:
+                Logger.error(str(e), prefix=cls._LOG_PREFIX)
+                results[mod] = UpdateResult(mod, "failed", exception=e)
+                continue
+            output_paths[output_path] = mod
+            groups.setdefault(mod_version.guid, []).append((mod, mod_info, output_path))
+
+        if groups and target_version is not None:
+            Logger.info(f"{sum(len(group) for group in groups.values())} outdated mods from {len(groups)} versions", prefix=cls._LOG_PREFIX)
+            with TemporaryDirectory() as tmp:
+                temporary_directory: Path = Path(tmp)
+
+                stage = stage.next("Downloading ImageSets", versions=len(groups) + 1)
+                Logger.info("Downloading ImageSets...", prefix=cls._LOG_PREFIX)
+                try:
+                    luapackages: dict[str, Luapackages] = cls._get_luapackages([*groups, target_version.guid], temporary_directory / "luapackages")
+                except Exception as e:
+                    Logger.error(f"Failed to download ImageSets: {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+                    for group in groups.values():
+                        for mod, _, _ in group:
+                            results[mod] = UpdateResult(mod, "failed", exception=e)
+                    luapackages = {}
+
+                if luapackages:
+                    stage = stage.next("Updating mods")
+                    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                        futures: dict[Future, Path] = {}
+                        for version_guid, group in groups.items():
+                            for mod, mod_info, output_path in group:
+                                future: Future = executor.submit(
+                                    cls._update_mod_from_luapackages, mod, mod_info, target_version,
+                                    luapackages[version_guid], luapackages[target_version.guid],
+                                    temporary_directory / "update" / str(len(futures)), output_path
+                                )
+                                futures[future] = mod
+
+                        for future in as_completed(futures):
+                            mod = futures[future]
+                            try:
+                                results[mod] = UpdateResult(mod, "updated", output=future.result())
+                            except Exception as e:
+                                Logger.error(f"Failed to update '{mod.name}': {type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+                                results[mod] = UpdateResult(mod, "failed", exception=e)
+
+        stage.end()
+        updated_count: int = sum(result.status == "updated" for result in results.values())
+        failed_count: int = sum(result.status == "failed" for result in results.values())
+        Logger.info(f"{updated_count} mods updated, {failed_count} failed", prefix=cls._LOG_PREFIX)
+        return [results[mod] for mod in mods]
+
+
+    @staticmethod
+    def _get_output_path(mod: Path, output_dir: Optional[Path]) -> Path:
+        """Returns the path the mod is updated at. Mods that are already in output_dir, or all mods if it is None, are updated in place"""
+
+        mod = mod.resolve()
+        if output_dir is None:
+            return mod
+
+        output_path: Path = output_dir.resolve() / mod.name
+        if output_path == mod:
+            return mod
+        if mod.is_relative_to(output_path) or output_path.is_relative_to(mod):
+            raise OutputConflictError(mod, output_path, "the output path overlaps with the mod")
+        return output_path
+
+
+    @classmethod
+    def _update_mod_from_luapackages(cls, mod: Path, mod_info: dict[str, str | int], target_version: RobloxVersion, old_luapackages: Luapackages, new_luapackages: Luapackages, temporary_directory: Path, output_path: Path) -> Path:
+        """Copies the mod to output_path unless it is the mod itself, and updates it. Returns the updated mod"""
+
+        if output_path != mod.resolve():
+            if output_path.exists():
+                shutil.rmtree(output_path)
+            shutil.copytree(mod, output_path)
+            mod = output_path
+
+        cls._apply_update(mod, mod_info, target_version, old_luapackages, new_luapackages, temporary_directory)
+        Logger.info(f"Mod updated: '{mod.name}'", prefix=cls._LOG_PREFIX)
+        return mod
 
 
-            Logger.info("Locating ImageSets...", prefix=cls._LOG_PREFIX)
-            old_imagesetdata_path: Path = locate_imagesetdata(old_luapackages_path)
-            old_imagesets_dir: Path = locate_imagesets(old_luapackages_path)
-            old_temp_target_imageset_path: Path = temp_target / "ExtraContent" / "Luapackages" / old_imagesets_dir.relative_to(old_luapackages_path)
+    @classmethod
+    def _apply_update(cls, mod: Path, mod_info: dict[str, str | int], target_version: RobloxVersion, old_luapackages: Luapackages, new_luapackages: Luapackages, temporary_directory: Path) -> None:
+        """Moves the modded icons of old_luapackages onto new_luapackages, without modifying either of them. temporary_directory must be unique per mod"""
 
-            new_imagesetdata_path: Path = locate_imagesetdata(new_luapackages_path)
-            new_imagesets_dir: Path = locate_imagesets(new_luapackages_path)
-            new_temp_target_imageset_path: Path = temp_target / "ExtraContent" / "Luapackages" / new_imagesets_dir.relative_to(new_luapackages_path)
+        stage: Span = Profiler.span("Copying mod", category=cls._LOG_PREFIX, mod=mod.name)
+        temp_target: Path = temporary_directory / "mod"
+        temp_target.mkdir(parents=True, exist_ok=True)
+        temp_imagesets: Path = temporary_directory / "imagesets"
+        old_image_set_data: ImageSetData = old_luapackages.image_set_data
+        new_image_set_data: ImageSetData = new_luapackages.image_set_data
+        old_temp_target_imageset_path: Path = temp_target / "ExtraContent" / "Luapackages" / old_luapackages.imagesets_dir.relative_to(old_luapackages.path)
+        new_temp_target_imageset_path: Path = temp_target / "ExtraContent" / "Luapackages" / new_luapackages.imagesets_dir.relative_to(new_luapackages.path)
 
+        Logger.info("Copying mod...", prefix=cls._LOG_PREFIX)
+        shutil.copytree(mod, temp_target, dirs_exist_ok=True)
 
-            Logger.info(f"Parsing {new_imagesetdata_path.name}...", prefix=cls._LOG_PREFIX)
-            old_image_set_data: ImageSetData = ImageSetData(old_imagesetdata_path, old_imagesets_dir)
-            new_image_set_data: ImageSetData = ImageSetData(new_imagesetdata_path, new_imagesets_dir)
 
+        Logger.info("Writing info.json...", prefix=cls._LOG_PREFIX)
+        mod_info = {
+            **{key: value for key, value in mod_info.items() if key != "generatorFingerprint"},  # Updated ImageSets no longer match ModGenerator output, so they must not be reused as a base mod
+            "clientVersionUpload": target_version.guid,
+            "fileVersion": target_version.file_version.minor
+        }
+        with open(temp_target / "info.json", "w") as file:
+            json.dump(mod_info, file, indent=4)
 
-            Logger.info("Detecting modded icons...", prefix=cls._LOG_PREFIX)
-            modded_icons: dict[str, dict[str, Image.Image]] = {}
-            for imageset in old_image_set_data.imagesets:
-                size: str = imageset.size
-                if size not in modded_icons:
-                    modded_icons[size] = {}
 
-                mod_same_imageset_path: Path = old_temp_target_imageset_path / imageset.path.name
-                if not mod_same_imageset_path.exists():
-                    continue
+        stage = stage.next("Detecting modded icons")
+        Logger.info("Detecting modded icons...", prefix=cls._LOG_PREFIX)
+        modded_icons: dict[str, dict[str, Image.Image]] = {}
+        for imageset in old_image_set_data.imagesets:
+            size: str = imageset.size
+            if size not in modded_icons:
+                modded_icons[size] = {}
 
+            mod_same_imageset_path: Path = old_temp_target_imageset_path / imageset.path.name
+            if not mod_same_imageset_path.exists():
+                continue
+
+            with Profiler.span(imageset.path.name, category=cls._LOG_PREFIX):
                 with Image.open(imageset.path, formats=("PNG",)) as old_imageset:
                     if old_imageset.mode != "RGBA":
                         old_imageset = old_imageset.convert("RGBA")
@@ -196,26 +301,41 @@ class ModUpdater:
                         if mod_imageset.mode != "RGBA":
                             mod_imageset = mod_imageset.convert("RGBA")
 
-                        for icon in imageset.icons:
-                            old_cropped: Image.Image = old_imageset.crop((icon.x, icon.y, icon.x + icon.w, icon.y + icon.h))
-                            mod_cropped: Image.Image = mod_imageset.crop((icon.x, icon.y, icon.x + icon.w, icon.y + icon.h))
+                        if old_imageset.size != mod_imageset.size:  # Fall back to comparing icons one by one
+                            for icon in imageset.icons:
+                                old_cropped: Image.Image = old_imageset.crop((icon.x, icon.y, icon.x + icon.w, icon.y + icon.h))
+                                mod_cropped: Image.Image = mod_imageset.crop((icon.x, icon.y, icon.x + icon.w, icon.y + icon.h))
+
+                                if not cls._is_same_image(old_cropped, mod_cropped):
+                                    modded_icons[size][icon.name] = mod_cropped
+                            continue
 
-                            if not cls._is_same_image(old_cropped, mod_cropped):
-                                modded_icons[size][icon.name] = mod_cropped
+                        changed_pixels: np.ndarray = cls._get_changed_pixels(np.asarray(old_imageset, dtype=np.uint8), np.asarray(mod_imageset, dtype=np.uint8))
+                        if not changed_pixels.any():
+                            continue
 
-            modded_icon_count: int = len(modded_icons)
-            Logger.info(f"{modded_icon_count} modded icons detected!")
+                        summed_area_table: np.ndarray = cls._get_summed_area_table(changed_pixels)
+                        for icon in imageset.icons:
+                            if cls._count_in_rect(summed_area_table, icon.x, icon.y, icon.w, icon.h) > 0:
+                                modded_icons[size][icon.name] = mod_imageset.crop((icon.x, icon.y, icon.x + icon.w, icon.y + icon.h))
 
+        modded_icon_count: int = sum(len(icons) for icons in modded_icons.values())
+        Logger.info(f"{modded_icon_count} modded icons detected!")
 
-            Logger.info("Generating new ImageSets...", prefix=cls._LOG_PREFIX)
-            unmodded_imagesets: list[Path] = []
-            for imageset in new_image_set_data.imagesets:
-                if not imageset.path.exists():
-                    continue
 
-                size = imageset.size
-                is_modded: bool = False
+        stage = stage.next("Generating new ImageSets")
+        Logger.info("Generating new ImageSets...", prefix=cls._LOG_PREFIX)
+        # Unlisted files are kept as they are, listed ImageSets are only kept if they contain modded icons
+        listed_imagesets: set[str] = {imageset.path.name for imageset in new_image_set_data.imagesets}
+        shutil.copytree(new_luapackages.imagesets_dir, temp_imagesets, ignore=lambda directory, names: [name for name in names if name in listed_imagesets and Path(directory) == new_luapackages.imagesets_dir])
+        for imageset in new_image_set_data.imagesets:
+            if not imageset.path.exists():
+                continue
 
+            size = imageset.size
+            is_modded: bool = False
+
+            with Profiler.span(imageset.path.name, category=cls._LOG_PREFIX):
                 with Image.open(imageset.path, formats=("PNG",)) as new_imageset:
                     if new_imageset.mode != "RGBA":
                         new_imageset = new_imageset.convert("RGBA")
@@ -229,72 +349,139 @@ class ModUpdater:
                         is_modded = True
 
                     if is_modded:
-                        new_imageset.save(imageset.path, format="PNG")
-
-                if not is_modded:
-                    unmodded_imagesets.append(imageset.path)
-
-
-            Logger.info("Removing unmodded ImageSets...", prefix=cls._LOG_PREFIX)
-            for path in unmodded_imagesets:
-                path.unlink(missing_ok=True)
-
-            Logger.info("Finishing mod update...", prefix=cls._LOG_PREFIX)
-            # Remove old imagesets and empty folders leading up to it
-            shutil.rmtree(old_temp_target_imageset_path)
-            parent: Path = old_temp_target_imageset_path.parent
-            temp_target_resolved: str = str(temp_target.resolve())
-            while parent.resolve() != temp_target_resolved:
-                try: parent.rmdir()
-                except OSError: break
-                parent = parent.parent
-            # Copy new imagesets
-            new_temp_target_imageset_path.mkdir(parents=True, exist_ok=True)
-            shutil.copytree(new_imagesets_dir, new_temp_target_imageset_path, dirs_exist_ok=True)
-            # Replace original mod, with backup to avoid deleting the original mod if something goes wrong
-            backup: Path = mod.with_name(f"{mod.name}_backup")
-            counter: int = 0
-            while backup.exists():
-                counter += 1
-                backup = mod.with_name(f"{mod.name}_backup{counter}")
-            Logger.info("Backing up original mod...", prefix=cls._LOG_PREFIX)
-            mod.rename(backup)
-            try:
-                Logger.info("Attempting rename...", prefix=cls._LOG_PREFIX)
-                temp_target.rename(mod)
-            except Exception as e:
-                Logger.error(f"{type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
-                Logger.info("Rename failed, restoring backup...", prefix=cls._LOG_PREFIX)
-                backup.rename(mod)
-                raise
-            else:
-                Logger.info("Rename success, removing backup...", prefix=cls._LOG_PREFIX)
-                shutil.rmtree(backup)
+                        new_imageset.save(temp_imagesets / imageset.path.name, format="PNG")
+
+
+        stage = stage.next("Finishing")
+        Logger.info("Finishing mod update...", prefix=cls._LOG_PREFIX)
+        # Remove old imagesets and empty folders leading up to it
+        shutil.rmtree(old_temp_target_imageset_path)
+        parent: Path = old_temp_target_imageset_path.parent
+        temp_target_resolved: str = str(temp_target.resolve())
+        while parent.resolve() != temp_target_resolved:
+            try: parent.rmdir()
+            except OSError: break
+            parent = parent.parent
+        # Copy new imagesets
+        new_temp_target_imageset_path.mkdir(parents=True, exist_ok=True)
+        shutil.copytree(temp_imagesets, new_temp_target_imageset_path, dirs_exist_ok=True)
+        # Replace original mod, with backup to avoid deleting the original mod if something goes wrong
+        backup: Path = mod.with_name(f"{mod.name}_backup")
+        counter: int = 0
+        while backup.exists():
+            counter += 1
+            backup = mod.with_name(f"{mod.name}_backup{counter}")
+        Logger.info("Backing up original mod...", prefix=cls._LOG_PREFIX)
+        mod.rename(backup)
+        try:
+            Logger.info("Attempting rename...", prefix=cls._LOG_PREFIX)
+            temp_target.rename(mod)
+        except Exception as e:
+            Logger.error(f"{type(e).__name__}: {e}", prefix=cls._LOG_PREFIX)
+            Logger.info("Rename failed, restoring backup...", prefix=cls._LOG_PREFIX)
+            backup.rename(mod)
+            raise
+        else:
+            Logger.info("Rename success, removing backup...", prefix=cls._LOG_PREFIX)
+            shutil.rmtree(backup)
 
 
-        Logger.info("Mod updated successfully!", prefix=cls._LOG_PREFIX)
+        stage.end()
 
 
-    @staticmethod
-    def _is_same_image(image1: Image.Image, image2: Image.Image) -> bool:
+    @classmethod
+    def _get_luapackages(cls, version_guids: list[str], directory: Path) -> dict[str, Luapackages]:
+        """Downloads, extracts and parses the luapackages of every version concurrently"""
+
+        version_guids = list(dict.fromkeys(version_guids))
+        progress_callbacks: list[Callable[[int, int], None]] = cls._get_progress_callbacks("Downloading ImageSets", len(version_guids))
+        with ThreadPoolExecutor(max_workers=min(len(version_guids), cls._DOWNLOAD_WORKERS)) as executor:
+            futures: dict[str, Future] = {
+                version_guid: executor.submit(cls._fetch_luapackages, version_guid, directory / version_guid, progress_callback)
+                for version_guid, progress_callback in zip(version_guids, progress_callbacks)
+            }
+            return {version_guid: future.result() for version_guid, future in futures.items()}
+
+
+    @classmethod
+    def _fetch_luapackages(cls, version_guid: str, destination: Path, progress_callback: Optional[Callable[[int, int], None]] = None) -> Luapackages:
+        """Only extracts GetImageSetData.lua and the ImageSet directory, which is copied into the updated mod as a whole"""
+
+        with Profiler.span(f"Fetching {version_guid}", category=cls._LOG_PREFIX):
+            luapackages: Path = PackageCache.get(version_guid, "extracontent-luapackages.zip", progress_callback=progress_callback)
+            with ZipFile(luapackages, "r") as archive:
+                member_names: list[str] = archive.namelist()
+            imagesetdata_member: str = locate_imagesetdata_member(member_names)
+            imagesets_member_dir: str = locate_imagesets_member(member_names)
+            filesystem.extract_filtered(luapackages, destination, (lambda name: name == imagesetdata_member or name.startswith(imagesets_member_dir),))
+            imagesetdata_path: Path = locate_imagesetdata(destination)
+            imagesets_dir: Path = locate_imagesets(destination)
+            image_set_data: ImageSetData = ImageSetData(imagesetdata_path, imagesets_dir, version_guid=version_guid)
+        return Luapackages(destination.resolve(), imagesets_dir, image_set_data)
+
+
+    @classmethod
+    def _get_progress_callbacks(cls, label: str, count: int) -> list[Callable[[int, int], None]]:
+        """Returns one callback per download, progress is combined and logged in steps of 10%"""
+
+        lock: Lock = Lock()
+        progress: list[tuple[int, int]] = [(0, 0)] * count
+        last_step: list[int] = [0]
+
+        def report(index: int, downloaded: int, total: int) -> None:
+            with lock:
+                progress[index] = (downloaded, max(total, 0))
+                downloaded_sum: int = sum(item[0] for item in progress)
+                total_sum: int = sum(item[1] for item in progress)
+                if total_sum <= 0:
+                    return
+                step: int = min(downloaded_sum * 10 // total_sum, 10)
+                if step <= last_step[0]:
+                    return
+                last_step[0] = step
+                Logger.info(f"{label}: {step * 10}% ({downloaded_sum / 1048576:.1f} / {total_sum / 1048576:.1f} MiB)", prefix=cls._LOG_PREFIX)
+
+        return [lambda downloaded, total, index=index: report(index, downloaded, total) for index in range(count)]
+
+
+    @classmethod
+    def _is_same_image(cls, image1: Image.Image, image2: Image.Image) -> bool:
         """Assumes both images have mode RGBA"""
 
-        size: tuple[int, int] = image1.size
-        if size != image2.size:
+        if image1.size != image2.size:
             return False
 
-        image1_data = image1.getdata()
-        image2_data = image2.getdata()
+        return not cls._get_changed_pixels(np.asarray(image1, dtype=np.uint8), np.asarray(image2, dtype=np.uint8)).any()
 
-        for pixel1, pixel2 in zip(image1_data, image2_data):
-            a1, a2 = pixel1[3], pixel2[3]
 
-            if a1 != a2:
-                return False
-            elif a1 == 0:
-                continue
-            elif pixel1[:3] != pixel2[:3]:
-                return False
+    @staticmethod
+    def _get_changed_pixels(array1: np.ndarray, array2: np.ndarray) -> np.ndarray:
+        """Assumes both arrays are RGBA and have the same shape. Returns a boolean (height, width) mask"""
+
+        alpha1: np.ndarray = array1[..., 3]
+
+        # Pixels are equal if their alpha matches and, unless fully transparent, their RGB matches too
+        return (alpha1 != array2[..., 3]) | ((alpha1 != 0) & np.any(array1[..., :3] != array2[..., :3], axis=-1))
 
-        return True
+
+    @staticmethod
+    def _get_summed_area_table(mask: np.ndarray) -> np.ndarray:
+        """Padded with a leading row and column of zeros, so that table[y, x] is the sum of mask[:y, :x]"""
+
+        height, width = mask.shape
+        table: np.ndarray = np.zeros((height + 1, width + 1), dtype=np.int64)
+        np.cumsum(mask, axis=0, dtype=np.int64, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+
+
+    @staticmethod
+    def _count_in_rect(summed_area_table: np.ndarray, x: int, y: int, w: int, h: int) -> int:
+        """Rects are clipped to the table bounds"""
+
+        max_y: int = summed_area_table.shape[0] - 1
+        max_x: int = summed_area_table.shape[1] - 1
+        x0, y0 = min(max(x, 0), max_x), min(max(y, 0), max_y)
+        x1, y1 = min(max(x + w, 0), max_x), min(max(y + h, 0), max_y)
+        return int(summed_area_table[y1, x1] - summed_area_table[y0, x1] - summed_area_table[y1, x0] + summed_area_table[y0, x0])
 # endregion
\ No newline at end of file
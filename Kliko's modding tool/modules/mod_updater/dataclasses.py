@@ -0,0 +1,22 @@
+from typing import Literal, Optional
+from pathlib import Path
+from dataclasses import dataclass
+
+from .imagesets import ImageSetData
+
+
+@dataclass
+class Luapackages:
+    """An extracted extracontent-luapackages.zip, read-only so that it can be shared by multiple mod updates"""
+    path: Path
+    imagesets_dir: Path
+    image_set_data: ImageSetData
+
+
+@dataclass
+class UpdateResult:
+    """output is the updated mod, which is a copy if update_mods was given an output_dir"""
+    mod: Path
+    status: Literal["updated", "up_to_date", "incompatible", "failed"]
+    output: Optional[Path] = None
+    exception: Optional[Exception] = None
\ No newline at end of file
@@ -1,7 +1,21 @@
+from pathlib import Path
+
+
 class InvalidVersionError(Exception):
     """Raised when the requested file version does not exist"""
     file_version: int
 
     def __init__(self, file_version: int):
         self.file_version = file_version
-        super().__init__(f"Requested file version not found: {file_version}")
\ No newline at end of file
+        super().__init__(f"Requested file version not found: {file_version}")
+
+
+class OutputConflictError(Exception):
+    """Raised when a mod cannot be copied to its output path, because it overlaps with the mod itself or with the output of another mod"""
+    mod: Path
+    output_path: Path
+
+    def __init__(self, mod: Path, output_path: Path, reason: str):
+        self.mod = mod
+        self.output_path = output_path
+        super().__init__(f"Unable to update '{mod}' into '{output_path}': {reason}")
\ No newline at end of file
@@ -2,13 +2,12 @@
 Responsible for handling HTTP requests.
 
 Methods:
-    get(url: str, timeout: int | tuple[int, int] = (5, 10), attempts: int = 3, cache: bool = True) -> Response:
+    get(url: str, timeout: int | tuple[int, int] = (5, 10), attempts: int = 3, cache: bool = True, headers: dict[str, str] | None = None) -> Response:
         Makes a HTTP GET request to the specified URL.
 """
 
-import time
-
 from modules.logger import Logger
+from modules.profiler import Profiler, Span
 
 from .cache import Cache
 
@@ -16,7 +15,7 @@ import requests  # type: ignore
 from requests import Response, HTTPError, RequestException, ConnectionError  # type: ignore
 
 
-def get(url: str, timeout: int | tuple[int, int] = (5, 10), stream: bool = False, attempts: int = 3, cache: bool = True, ignore_cache: bool = False) -> Response:
+def get(url: str, timeout: int | tuple[int, int] = (5, 10), stream: bool = False, attempts: int = 3, cache: bool = True, ignore_cache: bool = False, headers: dict[str, str] | None = None) -> Response:
     """
     Makes a HTTP GET request to the specified URL.
 
@@ -26,6 +25,7 @@ def get(url: str, timeout: int | tuple[int, int] = (5, 10), stream: bool = False
         attempts (int, optional): The number of attempts for the request. Default is 3.
         cache (bool, optional): Whether the Response should be cached. Default is True.
         ignore_cache (bool, optional): Whether the cached responses should be ignored. Default is False.
+        headers (dict[str, str], optional): Additional request headers, e.g. for conditional or range requests. Default is None.
     """
 
     last_exception: Exception | None = None
@@ -35,10 +35,10 @@ def get(url: str, timeout: int | tuple[int, int] = (5, 10), stream: bool = False
             if not ignore_cache and Cache.includes(url):
                 return Cache.get(url)
 
-            start: float = time.time()
-            response: Response = requests.get(url, timeout=timeout, stream=stream)
+            span: Span = Profiler.span(f"GET {url}", category="Network", log=False)
+            response: Response = requests.get(url, timeout=timeout, stream=stream, headers=headers)
             response.raise_for_status()
-            duration: float = (time.time() - start) * 1000
+            duration: float = span.end()
 
             Logger.info(f"GET {url} -> {response.status_code} {response.reason or 'Reason unknown'} (duration: {duration:.2f}ms)")
 
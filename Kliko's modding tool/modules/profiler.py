@@ -0,0 +1,154 @@
+from multiprocessing import parent_process
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional
+import threading
+import json
+import time
+import os
+
+from modules.logger import Logger
+
+
+class Span:
+    """A perf_counter based timing span, recorded when it ends. Use it as a context manager or call end(), next() ends it and starts the following stage"""
+
+    name: str
+    category: str
+    args: dict[str, Any]
+    log: bool
+    _start: int
+    _ended: bool
+
+
+    def __init__(self, name: str, category: str, args: dict[str, Any], log: bool = True, start: Optional[int] = None):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.log = log
+        self._start = start if start is not None else time.perf_counter_ns()
+        self._ended = False
+
+
+    def __enter__(self) -> "Span":
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        self.end()
+
+
+    def end(self, end: Optional[int] = None) -> float:
+        """Returns the duration in milliseconds"""
+
+        if end is None:
+            end = time.perf_counter_ns()
+        duration: int = end - self._start
+        if not self._ended:
+            self._ended = True
+            Profiler.record(self, self._start, duration)
+        return duration / 1_000_000
+
+
+    def next(self, name: str, **args: Any) -> "Span":
+        end: int = time.perf_counter_ns()
+        span: Span = Span(name, self.category, args, self.log, start=end)
+        self.end(end)
+        return span
+
+
+class Profiler:
+    """Collects spans as Chrome trace events (chrome://tracing, ui.perfetto.dev), written next to the log file"""
+
+    events: list[dict[str, Any]] = []  # Recorded since the last flush
+    _lock: Lock = Lock()
+    _file_lock: Lock = Lock()
+    _TRACE_SUFFIX: bytes = b'],"displayTimeUnit":"ms"}'
+
+
+    @classmethod
+    def span(cls, name: str, category: str = "Profiler", log: bool = True, **args: Any) -> Span:
+        return Span(name, category, args, log)
+
+
+    @classmethod
+    def record(cls, span: Span, start: int, duration: int) -> None:
+        event: dict[str, Any] = {
+            "name": span.name, "cat": span.category, "ph": "X",
+            "ts": start / 1000, "dur": duration / 1000,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "args": span.args
+        }
+        with cls._lock:
+            cls.events.append(event)
+
+        if span.log and parent_process() is None:  # Worker processes must not log
+            Logger.debug(f"{span.name} took {duration / 1_000_000:.2f}ms", prefix=span.category)
+
+
+    @classmethod
+    def collect(cls) -> list[dict[str, Any]]:
+        """Removes and returns the events recorded by this process, used to send worker process events to the main process"""
+
+        pid: int = os.getpid()
+        with cls._lock:
+            collected: list[dict[str, Any]] = [event for event in cls.events if event["pid"] == pid]
+            cls.events = [event for event in cls.events if event["pid"] != pid]
+        return collected
+
+
+    @classmethod
+    def extend(cls, events: list[dict[str, Any]]) -> None:
+        with cls._lock:
+            cls.events.extend(events)
+
+
+    @classmethod
+    def get_trace_path(cls) -> Optional[Path]:
+        log_path: Optional[Path] = getattr(Logger, "filepath", None)
+        if log_path is None:
+            return None
+        return log_path.with_name(f"{log_path.stem}.trace.json")
+
+
+    @classmethod
+    def flush(cls) -> None:
+        """Appends the events recorded since the last flush to the trace file and removes them from memory. The file stays valid JSON after every flush"""
+
+        path: Optional[Path] = cls.get_trace_path()
+        if path is None:
+            return
+
+        with cls._lock:
+            events: list[dict[str, Any]] = cls.events
+            cls.events = []
+        if not events:
+            return
+
+        content: bytes = json.dumps(events, separators=(",", ":")).encode()[1:-1]  # Without the brackets
+        try:
+            with cls._file_lock:
+                if cls._can_append(path):
+                    with open(path, "r+b") as file:
+                        file.seek(-len(cls._TRACE_SUFFIX), os.SEEK_END)
+                        file.write(b"," + content + cls._TRACE_SUFFIX)
+                else:
+                    with open(path, "wb") as file:
+                        file.write(b'{"traceEvents":[' + content + cls._TRACE_SUFFIX)
+        except OSError as e:
+            Logger.warning(f"Unable to write trace file due to {type(e).__name__}: {e}", prefix="Profiler")
+
+
+    @classmethod
+    def _can_append(cls, path: Path) -> bool:
+        """True if path is a trace file written by flush() that contains at least one event"""
+
+        try:
+            with open(path, "rb") as file:
+                file.seek(0, os.SEEK_END)
+                if file.tell() <= len(cls._TRACE_SUFFIX) + len(b'{"traceEvents":['):
+                    return False
+                file.seek(-len(cls._TRACE_SUFFIX), os.SEEK_END)
+                return file.read() == cls._TRACE_SUFFIX
+        except OSError:
+            return False
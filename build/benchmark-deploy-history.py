@@ -0,0 +1,227 @@
+"""
+Benchmark and regression test for DeployHistory construction.
+
+The slotted RobloxVersion records are compared against a frozen copy of the packaging Version subclass they replaced (LegacyRobloxVersion), which serves as the reference for equality, ordering and lookups.
+The legacy records are built from the version strings of a synthetic DeployHistory.txt, like the old DeployHistory.__init__ did.
+The new records are built from the parsed records, like a warm start from Files.DEPLOY_HISTORY_CACHE, and include the lookup indexes.
+
+Usage: python build/benchmark-deploy-history.py [--deployments 30000] [--cases 20000] [--seed 0]
+Exits with code 1 if any output differs from the reference.
+"""
+
+from pathlib import Path
+from typing import Callable, Literal, Optional
+import argparse
+import tracemalloc
+import random
+import time
+import sys
+import gc
+
+SOURCE: Path = Path(__file__).parent.resolve().parent / "Kliko's modding tool"
+sys.path.insert(0, str(SOURCE))
+
+from modules.deployments import DeployHistory, RobloxVersion  # noqa: E402
+from modules.deployments.roblox_version import FileVersion  # noqa: E402
+from modules.deployments.deploy_history import DeploymentRecord  # noqa: E402
+
+from packaging.version import Version  # type: ignore  # noqa: E402
+
+
+class LegacyRobloxVersion(Version):
+    """Frozen copy of RobloxVersion before the slotted record, do not modify"""
+
+    binary_type: Literal["WindowsPlayer", "WindowsStudio64"]
+    guid: str
+    file_version: Version
+
+
+    def __init__(self, binary_type: Literal["WindowsPlayer", "WindowsStudio64"], guid: str, file_version: Version | str) -> None:
+        self.binary_type = binary_type
+        self.guid = guid
+        if isinstance(file_version, Version):
+            self.file_version = file_version
+        else:
+            self.file_version = Version(file_version)
+
+
+def get_legacy_deployments(text: str) -> tuple[LegacyRobloxVersion, ...]:
+    """Frozen copy of DeployHistory.__init__ before the cache, without the request, do not modify"""
+
+    deployments: list[LegacyRobloxVersion] = []
+    valid_binary_types: set[str] = {"WindowsPlayer", "WindowsStudio64"}
+    for line in text.splitlines():
+        try:
+            split_line: list[str] = line.split()
+            file_version: str = split_line[-2]
+            if not file_version.replace(".", "").isdigit():
+                continue
+            binary_type: str = split_line[1]
+            if binary_type == "Studio64": binary_type = "WindowsStudio64"
+            if binary_type not in valid_binary_types:
+                continue
+            guid: str = split_line[2]
+            deployments.append(LegacyRobloxVersion(binary_type, guid, file_version))  # type: ignore
+        except Exception: pass
+
+    return tuple(deployments)
+
+
+class SyntheticDeployHistory(DeployHistory):
+    """Reads its records from memory instead of the cache file and the network"""
+
+    records: list[DeploymentRecord] = []
+
+
+    @classmethod
+    def _get_records(cls) -> list[DeploymentRecord]:
+        return cls.records
+
+
+    @classmethod
+    def build(cls, records: list[DeploymentRecord]) -> DeployHistory:
+        DeployHistory._deployments = None
+        cls.records = records
+        return cls()
+
+
+def get_history(deployment_count: int, seed: int) -> str:
+    """Same line layout as the real DeployHistory.txt, with several deployments per file version and a few lines of other binary types"""
+
+    rng: random.Random = random.Random(seed)
+    lines: list[str] = []
+    minor: int = 400
+    for index in range(deployment_count):
+        minor += rng.random() < 0.02
+        binary_type: str = rng.choice(("WindowsPlayer", "Studio64", "WindowsStudio64", "Studio64", "MacPlayer"))
+        lines.append(f"New {binary_type} version-{rng.getrandbits(64):016x} at 1/1/2024 1:00:00 PM, file version: 0.{minor}.0.{minor * 10000 + index} ...\n")
+    return "".join(lines)
+
+
+def get_random_file_version(rng: random.Random) -> str:
+    """One to four components, often with trailing zeros"""
+
+    components: list[int] = [rng.choice((0, 0, 1, 2)) for _ in range(rng.randint(1, 4))]
+    return ".".join(map(str, components))
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """Returns the best time out of repeat runs, in seconds"""
+
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_memory(function: Callable[[], object]) -> float:
+    """Returns the memory retained by the result of function, in MiB"""
+
+    gc.collect()
+    tracemalloc.start()
+    result: object = function()
+    retained: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return retained / 1048576
+
+
+def check_file_versions(case_count: int, seed: int) -> int:
+    """Returns the number of mismatches"""
+
+    rng: random.Random = random.Random(seed)
+    mismatches: int = 0
+    for index in range(case_count):
+        value1, value2 = get_random_file_version(rng), get_random_file_version(rng)
+        legacy1, legacy2 = Version(value1), Version(value2)
+        version1, version2 = FileVersion.parse(value1), FileVersion.parse(value2)
+        expected: tuple = (legacy1 == legacy2, legacy1 < legacy2, legacy1 > legacy2, legacy1.minor, legacy2.minor)
+        result: tuple = (version1 == version2, version1 < version2, version1 > version2, version1.minor, version2.minor)
+        if result == expected:
+            continue
+        mismatches += 1
+        if mismatches <= 5:
+            print(f"\n[ERROR] Case {index} ('{value1}', '{value2}') differs from packaging.version.Version")
+            print(f"Expected (==, <, >, minor, minor): {expected}")
+            print(f"Result (==, <, >, minor, minor): {result}")
+    return mismatches
+
+
+def check_deployments(legacy_deployments: tuple[LegacyRobloxVersion, ...], history: DeployHistory, case_count: int, seed: int) -> int:
+    """Returns the number of mismatches"""
+
+    def get_fields(deployment: RobloxVersion | LegacyRobloxVersion) -> tuple[str, str, int]:
+        return (deployment.binary_type, deployment.guid, deployment.file_version.minor)
+
+    def get_guid(deployment: Optional[RobloxVersion | LegacyRobloxVersion]) -> Optional[str]:
+        return deployment.guid if deployment is not None else None
+
+    mismatches: int = 0
+    if [get_fields(deployment) for deployment in legacy_deployments] != [get_fields(deployment) for deployment in history.deployments]:
+        mismatches += 1
+        print("\n[ERROR] Deployments differ from the legacy deployments")
+        return mismatches
+
+    rng: random.Random = random.Random(seed)
+    for _ in range(case_count):
+        index1, index2 = rng.randrange(len(legacy_deployments)), rng.randrange(len(legacy_deployments))
+        legacy1, legacy2 = legacy_deployments[index1].file_version, legacy_deployments[index2].file_version
+        version1, version2 = history.deployments[index1].file_version, history.deployments[index2].file_version
+        if (legacy1 == legacy2, legacy1 < legacy2) != (version1 == version2, version1 < version2):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"\n[ERROR] Deployments {index1} and {index2} compare differently than the legacy deployments")
+
+    # Lookups return the newest match, like searching the legacy deployments from the end
+    binary_types: tuple[Literal["WindowsPlayer", "WindowsStudio64"], ...] = ("WindowsPlayer", "WindowsStudio64")
+    for binary_type in binary_types:
+        for minor in {deployment.file_version.minor for deployment in legacy_deployments} | {0}:
+            expected: Optional[LegacyRobloxVersion] = next((deployment for deployment in reversed(legacy_deployments) if deployment.binary_type == binary_type and deployment.file_version.minor == minor), None)
+            if get_guid(history.get_latest(minor, binary_type)) != get_guid(expected):
+                mismatches += 1
+                print(f"\n[ERROR] get_latest({minor}, '{binary_type}') differs from the legacy deployments")
+    for deployment in rng.sample(legacy_deployments, min(case_count, len(legacy_deployments))):
+        if get_guid(history.get_by_guid(deployment.guid)) != deployment.guid:
+            mismatches += 1
+            print(f"\n[ERROR] get_by_guid('{deployment.guid}') differs from the legacy deployments")
+    return mismatches
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark and regression test for DeployHistory construction")
+    parser.add_argument("--deployments", type=int, default=30000, help="lines in the synthetic DeployHistory.txt (default: 30000)")
+    parser.add_argument("--cases", type=int, default=20000, help="number of randomized comparisons (default: 20000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args: argparse.Namespace = parser.parse_args()
+
+    print("[INFO] Checking randomized file versions...")
+    mismatches: int = check_file_versions(args.cases, args.seed)
+
+    print("[INFO] Generating synthetic DeployHistory.txt...")
+    text: str = get_history(args.deployments, args.seed)
+    records: list[DeploymentRecord] = DeployHistory._parse(text)
+    print(f"[INFO] {len(text) / 1048576:.1f} MiB, {len(records)} deployments")
+
+    print("[INFO] Checking synthetic deployments...")
+    mismatches += check_deployments(get_legacy_deployments(text), SyntheticDeployHistory.build(records), args.cases, args.seed)
+
+    print("[INFO] Running benchmark...")
+    legacy_time: float = measure(lambda: get_legacy_deployments(text))
+    parse_time: float = measure(lambda: SyntheticDeployHistory.build(DeployHistory._parse(text)))
+    build_time: float = measure(lambda: SyntheticDeployHistory.build(records))
+    legacy_memory: float = measure_memory(lambda: get_legacy_deployments(text))
+    build_memory: float = measure_memory(lambda: SyntheticDeployHistory.build(records))
+    print(f"Legacy parse + construction:   {legacy_time * 1000:8.1f} ms, {legacy_memory:6.2f} MiB retained")
+    print(f"Parse + construction:          {parse_time * 1000:8.1f} ms ({legacy_time / parse_time:.2f}x)")
+    print(f"Cached records + construction: {build_time * 1000:8.1f} ms ({legacy_time / build_time:.2f}x), {build_memory:6.2f} MiB retained")
+
+    if mismatches:
+        print(f"\n[ERROR] {mismatches} mismatches!")
+        sys.exit(1)
+    print("[INFO] Done!")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
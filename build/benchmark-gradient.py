@@ -0,0 +1,183 @@
+"""
+Benchmark and regression test for MaskStorage.get_gradient.
+
+The lookup table engine is compared against a frozen copy of the meshgrid engine it replaced (LegacyGradient), which serves as the reference output.
+Every channel may differ by at most 1, due to rounding positions to the nearest sample of the table.
+Pixels within EDGE_TOLERANCE of the first or last stop are not compared, float32 positions may fall on the other side of the edge to black.
+Stops closer than MIN_STOP_GAP are not generated, the table would need more than GRADIENT_LUT_MAX_SIZE samples.
+
+Usage: python build/benchmark-gradient.py [--size 1024] [--angle 30] [--cases 2000] [--seed 0]
+Exits with code 1 if any output differs from the reference.
+"""
+
+from pathlib import Path
+from typing import Callable
+import argparse
+import random
+import math
+import time
+import sys
+
+SOURCE: Path = Path(__file__).parent.resolve().parent / "Kliko's modding tool"
+sys.path.insert(0, str(SOURCE))
+
+from modules.mod_generator.dataclasses import GradientColor  # noqa: E402
+from modules.mod_generator.utils.mask_storage import MaskStorage  # noqa: E402
+
+from PIL import Image  # noqa: E402
+import numpy as np  # noqa: E402
+
+
+MAX_DIFFERENCE: int = 1
+EDGE_TOLERANCE: float = 1e-6
+MIN_STOP_GAP: float = 0.001
+STOP_COUNTS: tuple[int, ...] = (2, 8, 32)
+
+
+class LegacyGradient:
+    """Frozen copy of MaskStorage.get_gradient before the lookup table engine, without caching, do not modify"""
+
+    @staticmethod
+    def get_gradient(colors: list[GradientColor], angle_degrees: float, size: tuple[int, int]) -> Image.Image:
+        width, height = size
+        angle: float = math.radians(angle_degrees)
+
+        dx: float = math.cos(angle)
+        dy: float = math.sin(angle)
+
+        x = np.linspace(0, 1, width)
+        y = np.linspace(0, 1, height)
+        xv, yv = np.meshgrid(x, y)
+        pos = (xv * dx + yv * dy)
+        pos = (pos - pos.min()) / (pos.max() - pos.min())
+
+        img = np.zeros((height, width, 3), dtype=np.uint8)
+        sorted_colors: list[GradientColor] = sorted(colors, key=lambda item: item.stop)
+
+        for i in range(len(sorted_colors) - 1):
+            color_item0 = sorted_colors[i]
+            p0 = color_item0.stop
+            c0 = color_item0.color
+
+            color_item1 = sorted_colors[i+1]
+            p1 = color_item1.stop
+            c1 = color_item1.color
+
+            if p0 == p1:
+                continue
+
+            mask = (pos >= p0) & (pos <= p1)
+            t = (pos[mask] - p0) / (p1 - p0)
+
+            for ch in range(3):
+                img[..., ch][mask] = (np.array(c0[ch]) * (1 - t) + np.array(c1[ch]) * t).astype(np.uint8)
+
+        return Image.fromarray(img)
+
+
+    @staticmethod
+    def get_positions(angle_degrees: float, size: tuple[int, int]) -> np.ndarray:
+        """Same positions as get_gradient, normalized to [0, 1]"""
+
+        width, height = size
+        angle: float = math.radians(angle_degrees)
+        xv, yv = np.meshgrid(np.linspace(0, 1, width), np.linspace(0, 1, height))
+        pos = xv * math.cos(angle) + yv * math.sin(angle)
+        return (pos - pos.min()) / (pos.max() - pos.min())
+
+
+def get_random_colors(rng: random.Random, count: int, first_stop: float, last_stop: float) -> list[GradientColor]:
+    """Unsorted, like the stops of a user-defined gradient"""
+
+    while True:
+        stops: list[float] = sorted([first_stop, last_stop] + [rng.uniform(first_stop, last_stop) for _ in range(count - 2)])
+        if all(stop2 - stop1 >= MIN_STOP_GAP for stop1, stop2 in zip(stops, stops[1:])):
+            break
+    colors: list[GradientColor] = [GradientColor(stop, (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))) for stop in stops]
+    rng.shuffle(colors)
+    return colors
+
+
+def get_difference(colors: list[GradientColor], angle: float, size: tuple[int, int]) -> int:
+    """Returns the largest difference of any channel, ignoring pixels at the edges of the first and last stop"""
+
+    with np.errstate(invalid="ignore"):  # Degenerate masks, e.g. 1 pixel wide at 0 degrees, divide by zero in the legacy engine
+        expected: np.ndarray = np.asarray(LegacyGradient.get_gradient(colors, angle, size), dtype=np.int16)
+        pos: np.ndarray = LegacyGradient.get_positions(angle, size)
+    result: np.ndarray = np.asarray(MaskStorage.get_gradient(colors, angle, size, dont_cache=True), dtype=np.int16)
+    difference: np.ndarray = np.abs(expected - result).max(axis=-1)
+
+    stops: list[float] = [item.stop for item in colors]
+    difference[(np.abs(pos - min(stops)) < EDGE_TOLERANCE) | (np.abs(pos - max(stops)) < EDGE_TOLERANCE)] = 0
+    return int(difference.max())
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """Returns the best time out of repeat runs, in seconds"""
+
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_random_gradients(case_count: int, seed: int) -> int:
+    """Returns the number of mismatches"""
+
+    rng: random.Random = random.Random(seed)
+    mismatches: int = 0
+    for index in range(case_count):
+        count: int = rng.choice(STOP_COUNTS)
+        first_stop, last_stop = rng.choice(((0.0, 1.0), (rng.uniform(0, 0.4), rng.uniform(0.6, 1))))
+        colors: list[GradientColor] = get_random_colors(rng, count, first_stop, last_stop)
+        angle: float = rng.choice((0, 45, 90, 180, 270, rng.uniform(0, 360)))
+        size: tuple[int, int] = (rng.randint(1, 160), rng.randint(1, 160))
+
+        difference: int = get_difference(colors, angle, size)
+        if difference <= MAX_DIFFERENCE:
+            continue
+        mismatches += 1
+        if mismatches <= 5:
+            print(f"\n[ERROR] Case {index} differs from the legacy engine by {difference}")
+            print(f"Colors: {colors}")
+            print(f"Angle: {angle}, size: {size}")
+    return mismatches
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark and regression test for the gradient mask engine")
+    parser.add_argument("--size", type=int, default=1024, help="width and height of the benchmarked masks (default: 1024)")
+    parser.add_argument("--angle", type=float, default=30, help="angle of the benchmarked masks (default: 30)")
+    parser.add_argument("--cases", type=int, default=2000, help="number of randomized gradients (default: 2000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args: argparse.Namespace = parser.parse_args()
+
+    print("[INFO] Checking randomized gradients...")
+    mismatches: int = check_random_gradients(args.cases, args.seed)
+
+    # The lookup table is rebuilt on every run, as it would be for a new gradient
+    print("[INFO] Running benchmark...")
+    rng: random.Random = random.Random(args.seed)
+    size: tuple[int, int] = (args.size, args.size)
+    for count in STOP_COUNTS:
+        colors: list[GradientColor] = get_random_colors(rng, count, 0, 1)
+        difference: int = get_difference(colors, args.angle, size)
+        if difference > MAX_DIFFERENCE:
+            mismatches += 1
+            print(f"\n[ERROR] {count} stops gradient differs from the legacy engine by {difference}")
+
+        legacy_time: float = measure(lambda: LegacyGradient.get_gradient(colors, args.angle, size))
+        lut_time: float = measure(lambda: (MaskStorage._gradient_luts.clear(), MaskStorage.get_gradient(colors, args.angle, size, dont_cache=True)))
+        print(f"{count:2} stops, legacy engine:        {legacy_time * 1000:8.1f} ms")
+        print(f"{count:2} stops, lookup table engine:  {lut_time * 1000:8.1f} ms ({legacy_time / lut_time:.2f}x, max difference {difference})")
+
+    if mismatches:
+        print(f"\n[ERROR] {mismatches} mismatches!")
+        sys.exit(1)
+    print("[INFO] Done!")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
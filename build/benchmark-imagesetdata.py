@@ -0,0 +1,187 @@
+"""
+Benchmark and regression test for modules.imagesets.parse_imagesetdata.
+
+The single-pass scanner is compared against a frozen copy of the parser it replaced (LegacyParser), which serves as the reference output.
+Files where a make_assets_Nx() function is never closed with '} end' are not generated, the legacy parser silently drops or merges those functions.
+
+Usage: python build/benchmark-imagesetdata.py [--icons 20000] [--cases 5000] [--seed 0]
+Exits with code 1 if any output differs from the reference.
+"""
+
+from pathlib import Path
+from io import StringIO
+from typing import Callable, Iterator
+import argparse
+import random
+import time
+import sys
+import re
+
+SOURCE: Path = Path(__file__).parent.resolve().parent / "Kliko's modding tool"
+sys.path.insert(0, str(SOURCE))
+
+from modules.imagesets import IconRecord, parse_imagesetdata  # noqa: E402
+from modules.imagesets import parser as imagesets_parser  # noqa: E402
+
+
+SMALL_STREAM_OVERLAP: int = 512  # Longer than any token in get_random_file, so that streamed small files are cut at chunk boundaries
+
+
+class LegacyParser:
+    """Frozen copy of ImageSetData._parse_file_content before the single-pass scanner, do not modify"""
+
+    @staticmethod
+    def parse(content: str) -> dict[str, dict[str, dict[str, str | int]]]:
+        icon_map: dict[str, dict[str, dict[str, str | int]]] = {}
+
+        image_size_pattern: str = r"function make_assets_(\dx)\(\).*?(\{.*?\}) end"
+        icon_data_pattern: str = r"\['([^']+)'\] = \{ ImageRectOffset = Vector2\.new\((\d+), (\d+)\), ImageRectSize = Vector2\.new\((\d+), (\d+)\), ImageSet = '([^']+)' \}"
+
+        image_size_matches: list = re.findall(image_size_pattern, content, re.DOTALL)
+        for size, data in image_size_matches:
+            if size not in icon_map:
+                icon_map[size] = {}
+
+            icon_data_matches: list = re.findall(icon_data_pattern, data)
+            for icon in icon_data_matches:
+                name, x, y, w, h, image_set = icon
+                icon_map[size][name] = {
+                    "image_set": image_set,
+                    "x": int(x),
+                    "y": int(y),
+                    "w": int(w),
+                    "h": int(h)
+                }
+
+        return icon_map
+
+
+    @classmethod
+    def get_records(cls, content: str) -> dict[str, list[IconRecord]]:
+        """Same output format as parse_imagesetdata"""
+
+        return {
+            size: [(name, data["image_set"], data["x"], data["y"], data["w"], data["h"]) for name, data in icons.items()]  # type: ignore
+            for size, icons in cls.parse(content).items()
+        }
+
+
+def get_icon(name: str, image_set: str, x: int, y: int, w: int, h: int) -> str:
+    return f"['{name}'] = {{ ImageRectOffset = Vector2.new({x}, {y}), ImageRectSize = Vector2.new({w}, {h}), ImageSet = '{image_set}' }}"
+
+
+def get_large_file(icon_count: int, seed: int) -> str:
+    """Same layout as the real GetImageSetData.lua: one make_assets_Nx() function per size, each returning a single table"""
+
+    rng: random.Random = random.Random(seed)
+    lines: list[str] = ["local ImageSetData = {}\n"]
+    for size in (1, 2, 3):
+        icons: list[str] = [
+            get_icon(f"icons/category{index % 40}/icon_{index}", f"img_set_{size}x_{index // 500 + 1}", rng.randint(0, 1024), rng.randint(0, 1024), 36 * size, 36 * size)
+            for index in range(icon_count)
+        ]
+        lines.append(f"local function make_assets_{size}x()\n\treturn {{ {', '.join(icons)} }} end\n")
+    lines.append("return ImageSetData\n")
+    return "".join(lines)
+
+
+def get_random_file(rng: random.Random) -> str:
+    """Small file with duplicate sizes and names, empty functions, noise and icons outside of functions"""
+
+    def random_icon() -> str:
+        return get_icon(f"icons/{rng.choice('abcdef')}", f"img_set_{rng.randint(1, 3)}", rng.randint(0, 99), rng.randint(0, 99), rng.randint(1, 9), rng.randint(1, 9))
+
+    body_parts: list[Callable[[], str]] = [random_icon, lambda: ", ", lambda: "\n\t", lambda: "{ ", lambda: "local x = {}\n", lambda: "--[[ comment ]]"]
+    outside_parts: list[Callable[[], str]] = body_parts + [lambda: "} end", lambda: " end\n", lambda: "function make_assets()\n"]
+
+    parts: list[str] = []
+    for _ in range(rng.randint(0, 6)):
+        parts.extend(rng.choice(outside_parts)() for _ in range(rng.randint(0, 3)))
+        parts.append(f"local function make_assets_{rng.randint(1, 3)}x()\n\treturn {{ ")
+        parts.extend(rng.choice(body_parts)() for _ in range(rng.randint(0, 8)))
+        parts.append(rng.choice([" } end\n", "} end", " }} end"]))
+    return "".join(parts)
+
+
+def get_chunks(content: str, chunk_size: int) -> Iterator[str]:
+    stream: StringIO = StringIO(content)
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """Returns the best time out of repeat runs, in seconds"""
+
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_random_files(case_count: int, seed: int) -> int:
+    """Returns the number of mismatches"""
+
+    rng: random.Random = random.Random(seed)
+    mismatches: int = 0
+    stream_overlap: int = imagesets_parser._STREAM_OVERLAP
+    imagesets_parser._STREAM_OVERLAP = SMALL_STREAM_OVERLAP
+    try:
+        for index in range(case_count):
+            content: str = get_random_file(rng)
+            expected: dict[str, list[IconRecord]] = LegacyParser.get_records(content)
+            chunk_size: int = rng.randint(1, 64)
+            for name, result in (("content", parse_imagesetdata((content,))), (f"chunks of {chunk_size}", parse_imagesetdata(get_chunks(content, chunk_size)))):
+                if result == expected:
+                    continue
+                mismatches += 1
+                if mismatches <= 5:
+                    print(f"\n[ERROR] Case {index} ({name}) differs from the legacy parser")
+                    print(f"Content: {content!r}")
+                    print(f"Expected: {expected}")
+                    print(f"Result: {result}")
+    finally:
+        imagesets_parser._STREAM_OVERLAP = stream_overlap
+    return mismatches
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark and regression test for the GetImageSetData.lua scanner")
+    parser.add_argument("--icons", type=int, default=20000, help="icons per size in the synthetic file (default: 20000)")
+    parser.add_argument("--cases", type=int, default=5000, help="number of randomized small files (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args: argparse.Namespace = parser.parse_args()
+
+    print("[INFO] Checking randomized files...")
+    mismatches: int = check_random_files(args.cases, args.seed)
+
+    print("[INFO] Generating synthetic GetImageSetData.lua...")
+    content: str = get_large_file(args.icons, args.seed)
+    print(f"[INFO] {len(content) / 1048576:.1f} MiB, {3 * args.icons} icons")
+
+    print("[INFO] Checking synthetic file...")
+    expected: dict[str, list[IconRecord]] = LegacyParser.get_records(content)
+    for name, result in (("content", parse_imagesetdata((content,))), ("1 MiB chunks", parse_imagesetdata(get_chunks(content, 1024 * 1024)))):
+        if result != expected:
+            mismatches += 1
+            print(f"\n[ERROR] Synthetic file ({name}) differs from the legacy parser")
+
+    print("[INFO] Running benchmark...")
+    legacy_time: float = measure(lambda: LegacyParser.parse(content))
+    legacy_records_time: float = measure(lambda: LegacyParser.get_records(content))
+    scanner_time: float = measure(lambda: parse_imagesetdata((content,)))
+    streamed_time: float = measure(lambda: parse_imagesetdata(get_chunks(content, 1024 * 1024)))
+    print(f"Legacy parser:             {legacy_time * 1000:8.1f} ms")
+    print(f"Legacy parser to records:  {legacy_records_time * 1000:8.1f} ms")
+    print(f"Scanner:                   {scanner_time * 1000:8.1f} ms ({legacy_records_time / scanner_time:.2f}x)")
+    print(f"Scanner (1 MiB chunks):    {streamed_time * 1000:8.1f} ms ({legacy_records_time / streamed_time:.2f}x)")
+
+    if mismatches:
+        print(f"\n[ERROR] {mismatches} mismatches!")
+        sys.exit(1)
+    print("[INFO] Done!")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Benchmark and regression test for ModUpdater._is_same_image.
+
+The NumPy comparison is compared against a frozen copy of the per-pixel getdata() loop it replaced (LegacyComparison), which serves as the reference output.
+Pixels are equal if their alpha matches and, unless fully transparent, their RGB matches too.
+
+Usage: python build/benchmark-is-same-image.py [--size 1024] [--icons 1000] [--cases 5000] [--seed 0]
+Exits with code 1 if any output differs from the reference.
+"""
+
+from pathlib import Path
+from typing import Callable
+import argparse
+import random
+import time
+import sys
+
+SOURCE: Path = Path(__file__).parent.resolve().parent / "Kliko's modding tool"
+sys.path.insert(0, str(SOURCE))
+
+from modules.mod_updater import ModUpdater  # noqa: E402
+
+from PIL import Image  # noqa: E402
+
+
+class LegacyComparison:
+    """Frozen copy of ModUpdater._is_same_image before the NumPy comparison, do not modify"""
+
+    @staticmethod
+    def is_same_image(image1: Image.Image, image2: Image.Image) -> bool:
+        """Assumes both images have mode RGBA"""
+
+        size: tuple[int, int] = image1.size
+        if size != image2.size:
+            return False
+
+        image1_data = image1.getdata()
+        image2_data = image2.getdata()
+
+        for pixel1, pixel2 in zip(image1_data, image2_data):
+            a1, a2 = pixel1[3], pixel2[3]
+
+            if a1 != a2:
+                return False
+            elif a1 == 0:
+                continue
+            elif pixel1[:3] != pixel2[:3]:
+                return False
+
+        return True
+
+
+def get_random_image(rng: random.Random, width: int, height: int) -> Image.Image:
+    """Random RGBA image where about a quarter of the pixels are fully transparent"""
+
+    pixels: bytearray = bytearray(rng.randbytes(width * height * 4))
+    for index in range(3, len(pixels), 4):
+        if pixels[index] < 64:
+            pixels[index] = 0
+    return Image.frombytes("RGBA", (width, height), bytes(pixels))
+
+
+def get_random_pair(rng: random.Random) -> tuple[Image.Image, Image.Image]:
+    """Second image is a copy of the first with a few edited pixels, or one of another size"""
+
+    width, height = rng.randint(1, 12), rng.randint(1, 12)
+    image1: Image.Image = get_random_image(rng, width, height)
+    if rng.random() < 0.05:
+        return image1, get_random_image(rng, width + rng.randint(0, 1), height + rng.randint(1, 2))
+
+    image2: Image.Image = image1.copy()
+    for _ in range(rng.choice((0, 0, 1, 1, 2, 5))):
+        x, y = rng.randrange(width), rng.randrange(height)
+        r, g, b, a = image2.getpixel((x, y))  # type: ignore
+        match rng.randint(0, 3):
+            case 0: a = rng.choice((0, 255, (a + 1) % 256))  # Alpha edit
+            case 1: r = (r + 1) % 256  # RGB edit, only visible if alpha > 0
+            case 2: a, r, g, b = 0, rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)  # Hidden by transparency
+            case _: pass
+        image2.putpixel((x, y), (r, g, b, a))
+    return image1, image2
+
+
+def measure(function: Callable[[], object], repeat: int = 3) -> float:
+    """Returns the best time out of repeat runs, in seconds"""
+
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_random_pairs(case_count: int, seed: int) -> int:
+    """Returns the number of mismatches"""
+
+    rng: random.Random = random.Random(seed)
+    mismatches: int = 0
+    for index in range(case_count):
+        image1, image2 = get_random_pair(rng)
+        expected: bool = LegacyComparison.is_same_image(image1, image2)
+        result: bool = ModUpdater._is_same_image(image1, image2)
+        if result == expected:
+            continue
+        mismatches += 1
+        if mismatches <= 5:
+            print(f"\n[ERROR] Case {index} differs from the legacy comparison")
+            print(f"Image 1: {list(image1.getdata())}")
+            print(f"Image 2: {list(image2.getdata())}")
+            print(f"Expected: {expected}")
+            print(f"Result: {result}")
+    return mismatches
+
+
+def main() -> None:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Benchmark and regression test for the ImageSet icon comparison")
+    parser.add_argument("--size", type=int, default=1024, help="width and height of the synthetic ImageSet (default: 1024)")
+    parser.add_argument("--icons", type=int, default=1000, help="number of 36x36 icons (default: 1000)")
+    parser.add_argument("--cases", type=int, default=5000, help="number of randomized image pairs (default: 5000)")
+    parser.add_argument("--seed", type=int, default=0)
+    args: argparse.Namespace = parser.parse_args()
+
+    print("[INFO] Checking randomized image pairs...")
+    mismatches: int = check_random_pairs(args.cases, args.seed)
+
+    print("[INFO] Generating synthetic images...")
+    rng: random.Random = random.Random(args.seed)
+    imageset: Image.Image = get_random_image(rng, args.size, args.size)
+    imageset_copy: Image.Image = imageset.copy()
+    icons: list[Image.Image] = [get_random_image(rng, 36, 36) for _ in range(args.icons)]
+    icon_copies: list[Image.Image] = [icon.copy() for icon in icons]
+
+    print("[INFO] Checking synthetic images...")
+    for name, result in (("ImageSet", ModUpdater._is_same_image(imageset, imageset_copy)), ("icons", all(map(ModUpdater._is_same_image, icons, icon_copies)))):
+        if not result:
+            mismatches += 1
+            print(f"\n[ERROR] Synthetic {name} differ from their copies")
+
+    # Identical images, so that neither comparison can exit early
+    print("[INFO] Running benchmark...")
+    legacy_imageset_time: float = measure(lambda: LegacyComparison.is_same_image(imageset, imageset_copy))
+    imageset_time: float = measure(lambda: ModUpdater._is_same_image(imageset, imageset_copy))
+    legacy_icons_time: float = measure(lambda: all(map(LegacyComparison.is_same_image, icons, icon_copies)))
+    icons_time: float = measure(lambda: all(map(ModUpdater._is_same_image, icons, icon_copies)))
+    print(f"Legacy loop ({args.size}x{args.size}):    {legacy_imageset_time * 1000:8.1f} ms")
+    print(f"NumPy ({args.size}x{args.size}):          {imageset_time * 1000:8.1f} ms ({legacy_imageset_time / imageset_time:.2f}x)")
+    print(f"Legacy loop ({args.icons} x 36x36): {legacy_icons_time * 1000:8.1f} ms")
+    print(f"NumPy ({args.icons} x 36x36):       {icons_time * 1000:8.1f} ms ({legacy_icons_time / icons_time:.2f}x)")
+
+    if mismatches:
+        print(f"\n[ERROR] {mismatches} mismatches!")
+        sys.exit(1)
+    print("[INFO] Done!")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file